@@ -1,7 +1,54 @@
-from PyQt6.QtWidgets import QApplication
-from go import Go
+import os
 import sys
+import time
 
-app = QApplication([])
-myGo = Go()
-sys.exit(app.exec())
+_started = time.perf_counter_ns()
+
+# The modules import each other by plain name, so make them importable when
+# started as 'python -m 12345' from the parent directory too
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def _crash_dump(kind, value, tb):
+    """Keep an uncaught error and the events leading up to it in a trace file"""
+    import traceback
+    import tracing
+    tracing.error('uncaught', error=''.join(traceback.format_exception(kind, value, tb)))
+    count = tracing.dump('go-crash.jsonl')
+    sys.__excepthook__(kind, value, tb)
+    print(f"Trace of the last {count} events written to go-crash.jsonl", file=sys.stderr)
+
+
+def main(argv):
+    if argv and argv[0] == 'selfplay':
+        import selfplay
+        return selfplay.main(argv[1:])
+    if argv and argv[0] == 'db':
+        import game_db
+        return game_db.main(argv[1:])
+    if argv and argv[0] == 'bench':
+        import bench
+        return bench.main(argv[1:])
+    if argv and argv[0] == 'server':
+        import server
+        return server.main(argv[1:])
+    if argv and argv[0] == 'loadgen':
+        import loadgen
+        return loadgen.main(argv[1:])
+    if argv and argv[0] == 'startup':
+        import startup
+        return startup.main(argv[1:])
+
+    # Only the GUI needs Qt; the commands above never import it
+    from PyQt6.QtWidgets import QApplication
+    from go import Go
+    import startup
+    sys.excepthook = _crash_dump
+    app = QApplication([])
+    myGo = Go()
+    startup.watch_first_paint(app, _started)
+    return app.exec()
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,267 @@
+import numpy as np
+
+from piece import Piece
+
+EMPTY = Piece.NoPiece
+WHITE = Piece.White
+BLACK = Piece.Black
+BORDER = Piece.Border
+
+PASS = -1
+
+
+class BatchBoards:
+    """K Go boards held in one NumPy array and advanced together.
+
+    Boards use the same flat, border-padded layout as GameLogic, stored as
+    an int8 array of shape (K, (size + 2) ** 2). Chains, liberties and
+    captures are found with vectorised neighbour shifts and connected
+    component labeling over the whole batch, so one call advances every
+    game by a move. Moves are given as y * size + x, or PASS. Only simple
+    ko is enforced; superko needs per-game history and is left to GameLogic.
+    """
+
+    def __init__(self, count, size=9, komi=0.0):
+        self.count = count
+        self.size = size
+        self.width = size + 2
+        self.komi = komi
+        self.offsets = (-self.width, -1, 1, self.width)
+        layout = np.full((self.width, self.width), BORDER, dtype=np.int8)
+        layout[1:-1, 1:-1] = EMPTY
+        self.layout = layout.ravel()
+        # Padded index of every on-board point, in y * size + x order
+        self.points = np.flatnonzero(self.layout != BORDER)
+        self.reset()
+
+    def reset(self):
+        self.boards = np.tile(self.layout, (self.count, 1))
+        self.to_move = np.full(self.count, BLACK, dtype=np.int8)
+        self.captures = np.zeros((self.count, 3), dtype=np.int32)  # indexed by color
+        self.ko = np.full(self.count, -1, dtype=np.int64)  # padded point to_move may not take
+        self.passes = np.zeros(self.count, dtype=np.int8)
+        self.moves = np.zeros(self.count, dtype=np.int32)
+        # Chain label of every flat point (see _label), kept up to date by step
+        self.labels = np.full(self.boards.size, -1, dtype=np.int32)
+
+    @property
+    def finished(self):
+        """Games that ended with two passes in a row"""
+        return self.passes >= 2
+
+    # ----- vectorised helpers -----
+    #
+    # The padding keeps every on-board point's neighbours inside its own
+    # board, so the whole batch is treated as one flat array and a
+    # neighbour is just an offset into it.
+
+    def _neighbour(self, values, d, fill):
+        """values[p + d] for every flat index p of the batch"""
+        out = np.empty_like(values)
+        if d > 0:
+            out[:-d] = values[d:]
+            out[-d:] = fill
+        else:
+            out[-d:] = values[:d]
+            out[:-d] = fill
+        return out
+
+    def _label(self, mask):
+        """Connected components of same-valued points where mask is True.
+
+        Works on the flat batch; each point gets the smallest flat index in
+        its component and points outside mask get -1. Uses min-label
+        propagation with pointer jumping, so long chains need few rounds.
+        """
+        values = self.boards.ravel()
+        mask = mask.ravel()
+        total = values.size
+        pairs = []
+        for d in (1, self.width):
+            same = mask[:-d] & mask[d:] & (values[:-d] == values[d:])
+            pairs.append((d, same))
+        # One spare slot at the end lets pointer jumping index with 'total'
+        labels = np.full(total + 1, total, dtype=np.int32)
+        labels[:total][mask] = np.flatnonzero(mask)
+        while True:
+            before = labels.copy()
+            for d, same in pairs:
+                low, high = labels[:total - d], labels[d:total]
+                np.minimum(low, np.where(same, high, total), out=low)
+                np.minimum(high, np.where(same, low, total), out=high)
+            labels = labels[labels]
+            if np.array_equal(labels, before):
+                break
+        labels = labels[:total]
+        labels[labels == total] = -1
+        return labels
+
+    def _join(self, placed, color, playing):
+        """Update self.labels for one new stone per playing board.
+
+        placed holds flat indices. The stone and the friendly chains it
+        touches take the smallest of their labels, which is a single
+        remapping pass over the batch instead of a fresh labeling.
+        """
+        values = self.boards.ravel()
+        labels = self.labels
+        merged = placed.astype(np.int32)
+        friends = []
+        for d in self.offsets:
+            neighbour = labels[placed + d]
+            friend = playing & (values[placed + d] == color)
+            merged = np.where(friend, np.minimum(merged, neighbour), merged)
+            friends.append((friend, neighbour))
+        remap = np.arange(values.size, dtype=np.int32)
+        for friend, neighbour in friends:
+            remap[neighbour[friend]] = merged[friend]
+        stones = labels >= 0
+        labels[stones] = remap[labels[stones]]
+        labels[placed[playing]] = merged[playing]
+        return labels
+
+    def _liberty_classes(self, labels):
+        """Per chain label: 0, 1 or 2 meaning no, one or several liberties"""
+        values = self.boards.ravel()
+        total = values.size
+        index = np.arange(total)
+        lowest = np.full(total, total, dtype=np.int64)
+        highest = np.full(total, -1, dtype=np.int64)
+        for d in self.offsets:
+            neighbour = index + d
+            touching = labels >= 0
+            touching &= self._neighbour(values, d, BORDER) == EMPTY
+            np.minimum.at(lowest, labels[touching], neighbour[touching])
+            np.maximum.at(highest, labels[touching], neighbour[touching])
+        return np.where(highest < 0, 0, np.where(lowest == highest, 1, 2))
+
+    def _has_liberty(self, labels):
+        """Boolean per chain label: does the chain touch an empty point"""
+        values = self.boards.ravel()
+        result = np.zeros(values.size, dtype=bool)
+        for d in self.offsets:
+            touching = (labels >= 0) & (self._neighbour(values, d, BORDER) == EMPTY)
+            result[labels[touching]] = True
+        return result
+
+    def _around(self, point, condition):
+        """How many neighbours of each board's padded point satisfy condition"""
+        rows = np.arange(self.count)
+        return sum(condition(self.boards[rows, point + d]) for d in self.offsets)
+
+    # ----- rules -----
+
+    def legal_mask(self):
+        """(K, points) boolean array of legal moves for each board's player"""
+        values = self.boards.ravel()
+        labels = self.labels
+        liberties = self._liberty_classes(labels)
+        color = np.repeat(self.to_move, self.width * self.width)
+        legal = np.zeros(values.size, dtype=bool)
+        for d in self.offsets:
+            neighbour = self._neighbour(values, d, BORDER)
+            neighbour_libs = liberties[np.maximum(self._neighbour(labels, d, -1), 0)]
+            legal |= neighbour == EMPTY
+            legal |= (neighbour == color) & (neighbour_libs > 1)
+            legal |= (neighbour == 3 - color) & (neighbour_libs == 1)
+        legal &= values == EMPTY
+        legal = legal.reshape(self.boards.shape)
+        ko = self.ko >= 0
+        legal[np.flatnonzero(ko), self.ko[ko]] = False
+        return legal[:, self.points]
+
+    def step(self, moves):
+        """Play one move (or PASS) on every board.
+
+        Returns a boolean array that is False where the move was illegal;
+        those boards are left unchanged and keep the same player to move.
+        Finished boards ignore their move.
+        """
+        moves = np.asarray(moves)
+        boards = self.boards
+        area = self.width * self.width
+        rows = np.arange(self.count)
+        active = ~self.finished
+        passing = active & (moves == PASS)
+        point = self.points[np.where(moves == PASS, 0, moves)]
+        color = self.to_move
+        playing = active & ~passing & (boards[rows, point] == EMPTY) & (point != self.ko)
+
+        boards[rows[playing], point[playing]] = color[playing]
+        values = boards.ravel()
+        labels = self._join(rows * area + point, color, playing)
+        has_liberty = self._has_liberty(labels)
+
+        # Opponent chains left without liberties by the new stones are captured
+        enemy = values == np.repeat(np.where(playing, 3 - color, -1), area)
+        captured = enemy & ~has_liberty[np.maximum(labels, 0)]
+        values[captured] = EMPTY
+        labels[captured] = -1
+        captured = captured.reshape(boards.shape)
+        taken = captured.sum(axis=1)
+
+        # A move that captures nothing and leaves its own chain without
+        # liberties is suicide and is taken back
+        own = labels[rows * area + point]
+        has_liberty = self._has_liberty(labels)
+        suicide = playing & ~has_liberty[np.maximum(own, 0)]
+        if suicide.any():
+            boards[rows[suicide], point[suicide]] = EMPTY
+            playing &= ~suicide
+            # Taking the stone back may split the chain it joined
+            self.labels = self._label((values == BLACK) | (values == WHITE))
+
+        # Ko: a single stone captured a single stone and now sits in atari
+        is_ko = (playing & (taken == 1)
+                 & (self._around(point, lambda v: v == EMPTY) == 1)
+                 & (self._around(point, lambda v: v == color) == 0))
+        captured_point = np.argmax(captured, axis=1)
+        self.ko = np.where(playing, np.where(is_ko, captured_point, -1),
+                           np.where(passing, -1, self.ko))
+
+        self.captures[rows[playing], color[playing]] += taken[playing]
+        moved = playing | passing
+        self.passes = np.where(passing, self.passes + 1, np.where(playing, 0, self.passes))
+        self.to_move = np.where(moved, 3 - color, color).astype(np.int8)
+        self.moves += moved
+        return moved | ~active
+
+    # ----- policies and scoring -----
+
+    def random_moves(self, rng):
+        """A uniformly random legal move per board that does not fill an own eye"""
+        values = self.boards.ravel()
+        color = np.repeat(self.to_move, self.width * self.width)
+        eye = np.ones(values.size, dtype=bool)
+        for d in self.offsets:
+            neighbour = self._neighbour(values, d, BORDER)
+            eye &= (neighbour == color) | (neighbour == BORDER)
+        eye = eye.reshape(self.boards.shape)[:, self.points]
+        candidates = self.legal_mask() & ~eye
+        weights = rng.random(candidates.shape) * candidates
+        moves = np.argmax(weights, axis=1)
+        return np.where(candidates.any(axis=1), moves, PASS)
+
+    def score(self):
+        """Area score per board as black minus white, komi included"""
+        values = self.boards.ravel()
+        empty = values == EMPTY
+        labels = self._label(empty)
+        touches = np.zeros(values.size, dtype=np.int8)
+        for d in self.offsets:
+            neighbour = self._neighbour(values, d, BORDER)
+            stone = empty & ((neighbour == BLACK) | (neighbour == WHITE))
+            np.bitwise_or.at(touches, labels[stone], neighbour[stone])
+        owner = np.where(empty, touches[np.maximum(labels, 0)], values)
+        owner = owner.reshape(self.boards.shape)
+        black = (owner == BLACK).sum(axis=1)
+        white = (owner == WHITE).sum(axis=1)
+        return black - white - self.komi
+
+    def play_out(self, rng, max_moves=None):
+        """Play random games on every board until they all finish"""
+        if max_moves is None:
+            max_moves = 3 * self.size * self.size
+        while not self.finished.all() and self.moves.max() < max_moves:
+            self.step(self.random_moves(rng))
+        return self.score()
@@ -0,0 +1,264 @@
+"""Engine and rendering benchmarks.
+
+python -m 12345 bench --save baseline.json
+python -m 12345 bench --compare baseline.json
+
+Workloads are generated from fixed seeds, so runs on one machine are
+comparable. Each benchmark is timed several times and the best run is
+kept. With --compare the exit status is 1 when any result is slower
+than the baseline by more than --threshold percent.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+import scoring
+from game_logic import GameLogic
+from selfplay import random_policy, capture_policy
+
+
+def record_game(size, policy, seed):
+    """Moves of one seeded game, None for a pass"""
+    rng = random.Random(seed)
+    logic = GameLogic(size)
+    moves = []
+    while logic.passes_in_a_row() < 2 and len(moves) < 3 * size * size:
+        move = policy(logic, rng)
+        moves.append(move)
+        if move is None:
+            logic.pass_move()
+        else:
+            logic.play(*move)
+    return moves
+
+
+def replay(size, moves):
+    logic = GameLogic(size)
+    for move in moves:
+        if move is None:
+            logic.pass_move()
+        else:
+            logic.play(*move)
+    return logic
+
+
+# Each benchmark factory prepares its workload and returns (unit, run);
+# run() does the timed work and returns how many operations it made.
+
+def _replay_run(size, workload):
+    def run():
+        for moves in workload:
+            replay(size, moves)
+        return sum(len(moves) for moves in workload)
+    return run
+
+
+def bench_play(size, games=4):
+    """Moves/s through GameLogic.play, as GoBoard.make_move uses it"""
+    workload = [record_game(size, random_policy, seed) for seed in range(games)]
+    return 'moves/s', _replay_run(size, workload)
+
+
+def bench_captures(size, games=4):
+    """Moves/s replaying games whose players capture whenever they can"""
+    workload = [record_game(size, capture_policy, seed) for seed in range(games)]
+    return 'moves/s', _replay_run(size, workload)
+
+
+def bench_undo_redo(size, games=4):
+    """Moves/s undoing and redoing whole games"""
+    played = [replay(size, record_game(size, random_policy, seed)) for seed in range(games)]
+
+    def run():
+        count = 0
+        for logic in played:
+            while logic.undo() is not None:
+                count += 1
+            while logic.redo() is not None:
+                count += 1
+        return count
+    return 'moves/s', run
+
+
+def bench_legal_sweep(size, games=2):
+    """Legal move lists per second over every position of some games"""
+    workload = [record_game(size, random_policy, seed) for seed in range(games)]
+
+    def run():
+        count = 0
+        for moves in workload:
+            logic = GameLogic(size)
+            for move in moves:
+                logic.legal_moves()
+                logic.has_legal_move()
+                count += 1
+                if move is None:
+                    logic.pass_move()
+                else:
+                    logic.play(*move)
+        return count
+    return 'sweeps/s', run
+
+
+def bench_score(size, games=4):
+    """Area and territory scorings per second of finished games"""
+    boards = [replay(size, record_game(size, random_policy, seed)) for seed in range(games)]
+
+    def run():
+        for _ in range(10):
+            for logic in boards:
+                scoring.score(logic.board, logic.width, logic.captures, 7.5, 'area')
+                scoring.score(logic.board, logic.width, logic.captures, 7.5, 'territory')
+        return 20 * len(boards)
+    return 'scores/s', run
+
+
+# The QApplication the paint benchmarks need, kept alive between them
+_qt_app = None
+
+
+class _CanvasBoard:
+    """The parts of GoBoard that BoardCanvas reads, over a plain GameLogic"""
+
+    def __init__(self, logic):
+        self.logic = logic
+        self.board_size = logic.size
+        self.game_ended = False
+        self.current_player = 'black'
+        self.territory = None
+
+    @property
+    def board_state(self):
+        return self.logic.to_rows()
+
+    def probe_move(self, x, y):
+        return self.logic.probe(x, y)
+
+    def position_key(self):
+        return self.logic.position_key()
+
+
+def bench_paint(size, side=800):
+    """Offscreen BoardCanvas paints per second: full frames plus one stone"""
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PyQt6.QtCore import QPoint
+    from PyQt6.QtGui import QImage, QRegion
+    from PyQt6.QtWidgets import QApplication
+    from board_canvas import BoardCanvas
+
+    global _qt_app
+    _qt_app = QApplication.instance() or QApplication([])
+    board = _CanvasBoard(replay(size, record_game(size, random_policy, 0)[:size * size // 2]))
+    canvas = BoardCanvas(board)
+    canvas.resize(side, side)
+    image = QImage(side, side, QImage.Format.Format_ARGB32_Premultiplied)
+    stone = QRegion(canvas.point_rect(size // 2, size // 2))
+
+    def run():
+        for _ in range(10):
+            canvas.render(image)
+            for _ in range(10):
+                canvas.render(image, QPoint(), stone)
+        return 110
+    return 'paints/s', run
+
+
+BENCHMARKS = {
+    'play_9': lambda: bench_play(9),
+    'play_19': lambda: bench_play(19, games=2),
+    'captures_13': lambda: bench_captures(13),
+    'undo_redo_19': lambda: bench_undo_redo(19, games=2),
+    'legal_sweep_19': lambda: bench_legal_sweep(19, games=1),
+    'score_7': lambda: bench_score(7),
+    'score_9': lambda: bench_score(9),
+    'score_13': lambda: bench_score(13),
+    'score_19': lambda: bench_score(19),
+    'paint_9': lambda: bench_paint(9),
+    'paint_19': lambda: bench_paint(19),
+}
+
+
+def run_benchmarks(names=None, repeat=5, report=None):
+    """Run benchmarks and return {name: {'unit', 'value', 'runs'}}.
+
+    value is the best rate over repeat runs. Benchmarks whose optional
+    dependencies are missing (PyQt6 for painting) are skipped.
+    """
+    results = {}
+    for name in names or BENCHMARKS:
+        try:
+            unit, run = BENCHMARKS[name]()
+        except ImportError as e:
+            if report is not None:
+                report.write(f"{name}: skipped ({e})\n")
+            continue
+        rates = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            count = run()
+            rates.append(count / (time.perf_counter() - start))
+        results[name] = {'unit': unit, 'value': max(rates), 'runs': rates}
+        if report is not None:
+            report.write(f"{name}: {max(rates):,.0f} {unit}\n")
+    return results
+
+
+def machine_info():
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+
+def compare(results, baseline, threshold):
+    """Lines describing each change against baseline, and whether any regressed"""
+    lines = []
+    regressed = False
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            lines.append(f"{name:16} {result['value']:>14,.0f} {result['unit']:9} (new)")
+            continue
+        change = (result['value'] - base['value']) / base['value'] * 100
+        flag = ''
+        if change < -threshold:
+            flag = '  REGRESSION'
+            regressed = True
+        lines.append(f"{name:16} {result['value']:>14,.0f} {result['unit']:9} "
+                     f"baseline {base['value']:>14,.0f}  {change:+6.1f}%{flag}")
+    return lines, regressed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m 12345 bench',
+                                     description='Engine and rendering benchmarks.')
+    parser.add_argument('names', nargs='*', help=f"benchmarks to run (default all): {', '.join(BENCHMARKS)}")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--save', help='write the results to this JSON file')
+    parser.add_argument('--compare', help='JSON file of earlier results to compare against')
+    parser.add_argument('--threshold', type=float, default=10.0,
+                        help='percent slowdown reported as a regression')
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark: {', '.join(unknown)}")
+
+    results = run_benchmarks(args.names, args.repeat, report=sys.stderr)
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({'machine': machine_info(), 'results': results}, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+        lines, regressed = compare(results, baseline, args.threshold)
+        print('\n'.join(lines))
+        return 1 if regressed else 0
+    return 0
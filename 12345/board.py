@@ -1,20 +1,41 @@
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
-                            QLabel, QFrame, QGridLayout, QListWidget, QGraphicsDropShadowEffect, 
-                            QGraphicsBlurEffect, QDialog, QMessageBox)
-from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QColor
+                            QLabel, QFrame, QGridLayout, QListView, QGraphicsDropShadowEffect, 
+                            QGraphicsBlurEffect, QDialog, QMessageBox, QFileDialog)
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex, pyqtSignal
+from PyQt6.QtGui import QColor, QKeySequence
 from board_canvas import BoardCanvas
-from end_game import EndGameOverlay
 from PyQt6.QtCore import QTimer
+from game_logic import (GameLogic, COLORS, COLOR_NAMES, MIN_BOARD_SIZE, MAX_BOARD_SIZE,
+                        point_label, opponent)
+from move_log import PASS, RESIGN, TIMEOUT
+import time
+import clock
+import perf
+import scoring
+import tracing
+from workers import EngineWorker
 
 class GoBoard(QWidget):
+    # Picked up by the ScoreBoard dock (see ScoreBoard.make_connection)
+    clickLocationSignal = pyqtSignal(str)
+    updateTimerSignal = pyqtSignal(int)
+
     def __init__(self, size=9):
         super().__init__()
         # Initialize variables
         self.player1_name = ""
         self.player2_name = ""
-        self.current_player = 'black'
         self.board_size = size
+        self.logic = GameLogic(size)
+        self.preview_state = None
+        # Color played by the computer, or None for two human players
+        self.ai_color = None
+        self.ai_thinking = False
+        # AI search and final scoring run in a worker process
+        self.worker = EngineWorker(self)
+        # Game hosted on a server (client.RemoteGame), which has the final
+        # say on every move, or None for a local game
+        self.remote = None
         
         # Get screen size
         screen = self.screen()
@@ -25,23 +46,21 @@ class GoBoard(QWidget):
         self.cell_size = int(min(self.screen_width, self.screen_height) // (size + 2))
         self.board_margin = self.cell_size
         
-        # Timer initialization
+        # The clock measures time; the timer only refreshes the labels and
+        # fires when the running player's display next changes
+        self.clock = clock.GameClock(clock.absolute(30))
+        self.clock.start(self.logic.to_move)
         self.timer = QTimer()
-        self.black_time = 30 * 60
-        self.white_time = 30 * 60
+        self.timer.setSingleShot(True)
         self.timer.timeout.connect(self.update_timer)
         self.timer.start(1000)
         
         # Other initializations
-        self.captured_black = 0
-        self.captured_white = 0
-        self.move_history = []
         self.game_ended = False
         self.territory_score = {'black': 0, 'white': 0}
         self.directions = [(0, 1), (1, 0), (0, -1), (-1, 0)]
         
-        # Initialize board state and territory
-        self.board_state = [[None for _ in range(size)] for _ in range(size)]
+        # Initialize territory
         self.territory = [[None for _ in range(size)] for _ in range(size)]
         
         # Create UI
@@ -51,6 +70,56 @@ class GoBoard(QWidget):
         # Set window to fullscreen
         self.showFullScreen()
 
+    @property
+    def current_player(self):
+        return COLOR_NAMES[self.logic.to_move]
+
+    @current_player.setter
+    def current_player(self, color):
+        self.logic.to_move = COLORS[color]
+
+    @property
+    def captured_black(self):
+        """Stones captured by black"""
+        return self.logic.captures[COLORS['black']]
+
+    @property
+    def captured_white(self):
+        """Stones captured by white"""
+        return self.logic.captures[COLORS['white']]
+
+    @property
+    def board_state(self):
+        """Rows of 'black', 'white' or None, showing a preview if one is active"""
+        if self.preview_state is not None:
+            return self.preview_state
+        return self.logic.to_rows()
+
+    @property
+    def move_history(self):
+        """The game record as display strings"""
+        return [self.format_move(record) for record in self.logic.log]
+
+    def format_move(self, record):
+        """Display text for a MoveRecord, e.g. '● Alice: C4'"""
+        color = COLOR_NAMES[record.color]
+        winner = 'White' if color == 'black' else 'Black'
+        if record.is_stone:
+            name = self.player1_name if color == 'black' else self.player2_name
+            symbol = '●' if color == 'black' else '○'
+            return f"{symbol} {name}: {point_label(*self.logic.xy(record.point))}"
+        if record.point == PASS:
+            return f"{color.capitalize()} passed"
+        if record.point == RESIGN:
+            return f"{color.capitalize()} resigned. {winner} wins!"
+        if record.point == TIMEOUT:
+            return f"Time Out! {winner} wins!"
+        return "Game Over - No Valid Moves Remaining"
+
+    def clock_snapshot(self):
+        """(black, white) main time left in milliseconds, stored with each move"""
+        return self.clock.snapshot()
+
     def init_ui(self):
         main_layout = QVBoxLayout()
         main_layout.setSpacing(int(self.screen_height * 0.02))
@@ -95,20 +164,20 @@ class GoBoard(QWidget):
                 padding: 10px;
                 border-radius: 8px;
             }
-            QListWidget {
+            QListView {
                 background-color: rgba(52, 73, 94, 0.7);
                 color: white;
                 border-radius: 8px;
                 padding: 10px;
                 font-size: 13px;
             }
-            QListWidget::item {
+            QListView::item {
                 padding: 8px;
                 margin: 3px 0px;
                 background-color: rgba(44, 62, 80, 0.6);
                 border-radius: 4px;
             }
-            QListWidget::item:hover {
+            QListView::item:hover {
                 background-color: rgba(44, 62, 80, 0.8);
             }
         """)
@@ -223,7 +292,9 @@ class GoBoard(QWidget):
             }
         """)
         
-        self.history_list = QListWidget()
+        self.history_model = MoveHistoryModel(self)
+        self.history_list = QListView()
+        self.history_list.setModel(self.history_model)
         self.history_list.setMinimumHeight(300)
         
         history_layout.addWidget(history_label)
@@ -253,15 +324,15 @@ class GoBoard(QWidget):
             layout.addWidget(self.board_canvas)
             
             return container
-        except Exception as e:
-            print(f"Error creating board container: {e}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            tracing.exception('create_board_container')
             raise
 
 
     def make_move(self, x, y):
         """Handle making a move"""
+        if self.ai_thinking:
+            return False
         try:
             # First check if there are any valid moves
             if not self.check_for_valid_moves():
@@ -269,36 +340,24 @@ class GoBoard(QWidget):
                 return False
                 
 
+            self.clickLocationSignal.emit(f"({x}, {y})")
             if not self.handle_detection(x, y):
                 return False
-        
-            if self.move_history and self.move_history[-1].startswith('●' if self.current_player == 'black' else '○'):
-                return False
-            
-            self.board_state[y][x] = self.current_player
-            
-            # Process captures
-            captures = self.check_captures(x, y)
-            
-            # Check if move is still valid after captures
-            if not captures and self.get_liberties(x, y) == 0:
-                self.board_state[y][x] = None
+
+            if self.remote is not None and not self.remote_request('move', x, y):
                 return False
+
+            self.preview_state = None
+            # The move is added to the engine's move log
+            with perf.timed('move'):
+                captured = self.logic.play(x, y, self.clock_snapshot())
+            tracing.debug('move', x=x, y=y, captured=len(captured))
+            self.clock.press()
+            self.update_timer()
+            perf.gauge('game_record_bytes', self.logic.log.nbytes())
             
-            # Get current player name and symbol
-            current_name = (self.player1_name if self.current_player == 'black' 
-                        else self.player2_name)
-            symbol = '●' if self.current_player == 'black' else '○'
-            
-            # Convert numeric column to letter (0=A, 1=B, etc.)
-            col_letter = chr(65 + x)
-            
-            # Add move to history
-            move_text = f"{symbol} {current_name}: {col_letter}{y+1}"
-            self.move_history.append(move_text)
-            
-            # Switch player and update UI
-            self.switch_player()
+            # The engine has already handed the turn over, so only the UI needs updating
+            self.update_labels()
             
             # Check if next player has valid moves
             if not self.check_for_valid_moves():
@@ -307,23 +366,20 @@ class GoBoard(QWidget):
             self.update_history()
             self.update_labels()
             self.update_board()
+            self.schedule_ai_move()
             
             return True
             
-        except Exception as e:
-            print(f"Error in make_move: {e}")
-            self.board_state[y][x] = None
+        except Exception:
+            tracing.exception('make_move')
             return False
         
         
         
     def check_for_valid_moves(self):
         """Check if there are any valid moves available for the current player"""
-        for y in range(self.board_size):
-            for x in range(self.board_size):
-                if self.board_state[y][x] is None and self.is_valid_move(x, y):
-                    return True
-        return False
+        with perf.timed('legal_sweep'):
+            return self.logic.has_legal_move()
 
     def handle_no_moves(self):
         """Handle the situation when no moves are available"""
@@ -336,9 +392,9 @@ class GoBoard(QWidget):
     def show_game_over_message(self, reason, winner=None):
         """Show game over with the end game overlay"""
         if reason == "no_moves":
-            self.move_history.append("Game Over - No Valid Moves Remaining")
+            self.logic.no_moves(self.clock_snapshot())
         elif reason == "give_up":
-            self.move_history.append(f"Game Over - {self.current_player.capitalize()} Gave Up")
+            self.logic.resign(self.clock_snapshot())
         
         self.end_game()  # This will show the proper end game overlay
     
@@ -368,6 +424,10 @@ class GoBoard(QWidget):
         self.back_btn = QPushButton("← Back to Menu")
         self.reset_btn = QPushButton("↺ Reset Game")
         self.pass_btn = QPushButton("⟳ Pass Turn")
+        self.undo_btn = QPushButton("↶ Undo")
+        self.redo_btn = QPushButton("↷ Redo")
+        self.save_btn = QPushButton("💾 Save SGF")
+        self.open_btn = QPushButton("📂 Open SGF")
         
         # Style buttons
         button_style = """
@@ -401,8 +461,17 @@ class GoBoard(QWidget):
         # Pass button (Blue)
         self.pass_btn.setStyleSheet(button_style % ('#3498DB', '#2980B9', '#1F618D'))
         
+        # Undo/redo buttons (Purple)
+        self.undo_btn.setStyleSheet(button_style % ('#8E44AD', '#7D3C98', '#5B2C6F'))
+        self.redo_btn.setStyleSheet(button_style % ('#8E44AD', '#7D3C98', '#5B2C6F'))
+        
+        # Save/open buttons (Green)
+        self.save_btn.setStyleSheet(button_style % ('#27AE60', '#229954', '#1E8449'))
+        self.open_btn.setStyleSheet(button_style % ('#27AE60', '#229954', '#1E8449'))
+        
         # Add shadow effect to buttons
-        for btn in [self.back_btn, self.reset_btn, self.pass_btn]:
+        for btn in [self.back_btn, self.reset_btn, self.pass_btn, self.undo_btn, self.redo_btn,
+                    self.save_btn, self.open_btn]:
             shadow = QGraphicsDropShadowEffect()
             shadow.setBlurRadius(10)
             shadow.setOffset(0, 3)
@@ -413,6 +482,10 @@ class GoBoard(QWidget):
         layout.addWidget(self.back_btn)
         layout.addWidget(self.reset_btn)
         layout.addWidget(self.pass_btn)
+        layout.addWidget(self.undo_btn)
+        layout.addWidget(self.redo_btn)
+        layout.addWidget(self.save_btn)
+        layout.addWidget(self.open_btn)
         
         return container
 
@@ -432,199 +505,59 @@ class GoBoard(QWidget):
             self.player2_name_label.setText(f"○ White: {self.player2_name}")
             self.player1_captures_label.setText(f"Points: {black_total}")
             self.player2_captures_label.setText(f"Points: {white_total}")
-        except Exception as e:
-            print(f"Error updating labels: {e}")
+        except Exception:
+            tracing.exception('update_labels')
 
     def set_player_info(self, player1_name, player2_name):
         """Set player information"""
         self.player1_name = player1_name
         self.player2_name = player2_name
         self.update_labels()
+        self.history_model.refresh()
 
-    def get_liberties(self, x, y, visited=None):
-        """Count liberties of a stone or group"""
-        if visited is None:
-            visited = set()
-                
-        color = self.board_state[y][x]
-        if color is None:
-            return 0
-                
-        visited.add((x, y))
-        liberties = set()
-            
-        for dx, dy in self.directions:
-            new_x, new_y = x + dx, y + dy
-                
-            if not (0 <= new_x < self.board_size and 0 <= new_y < self.board_size):
-                continue
-                    
-            if self.board_state[new_y][new_x] is None:
-                liberties.add((new_x, new_y))
-            elif (self.board_state[new_y][new_x] == color and 
-                (new_x, new_y) not in visited):
-                # Fix: Don't try to update with an integer
-                group_liberties = self.get_liberties(new_x, new_y, visited)
-                if isinstance(group_liberties, set):
-                    liberties.update(group_liberties)
-                else:
-                    liberties.add((new_x, new_y))
-                        
-        return liberties  # Return the set of liberty positions
-
-    def find_group(self, x, y, visited=None):
-        """Find all connected stones of the same color"""
-        if visited is None:
-            visited = set()
-            
-        color = self.board_state[y][x]
-        if color is None:
-            return set()
-            
-        group = {(x, y)}
-        visited.add((x, y))
-        
-        for dx, dy in self.directions:
-            new_x, new_y = x + dx, y + dy
-            
-            if (0 <= new_x < self.board_size and 
-                0 <= new_y < self.board_size and 
-                self.board_state[new_y][new_x] == color and 
-                (new_x, new_y) not in visited):
-                group.update(self.find_group(new_x, new_y, visited))
-                
-        return group
+    def get_liberties(self, x, y):
+        """Return the set of liberty positions of the stone or group at (x, y)"""
+        return self.logic.liberties(x, y)
 
-    def check_captures(self, x, y):
-        """Check and remove captured stones"""
-        captured = 0
-        opponent = 'white' if self.current_player == 'black' else 'black'
-        
-        for dx, dy in self.directions:
-            new_x, new_y = x + dx, y + dy
-            
-            if not (0 <= new_x < self.board_size and 0 <= new_y < self.board_size):
-                continue
-                
-            if self.board_state[new_y][new_x] == opponent:
-                group = self.find_group(new_x, new_y)
-                has_liberties = False
-                
-                for gx, gy in group:
-                    liberties = self.get_liberties(gx, gy)
-                    if isinstance(liberties, set):
-                        has_liberties = len(liberties) > 0
-                    else:
-                        has_liberties = liberties > 0
-                    if has_liberties:
-                        break
-                
-                if not has_liberties:
-                    for gx, gy in group:
-                        self.board_state[gy][gx] = None
-                    captured += len(group)
-                    
-                    if self.current_player == 'black':
-                        self.captured_black += len(group)
-                    else:
-                        self.captured_white += len(group)
-        
-        return captured > 0
+    def find_group(self, x, y):
+        """Find all connected stones of the same color"""
+        return self.logic.find_group(x, y)
 
     def is_valid_move(self, x, y):
         """Check if a move is valid"""
-        if not (0 <= x < self.board_size and 0 <= y < self.board_size):
-            return False
-                
-        if self.board_state[y][x] is not None:
-            return False
-                
-        self.board_state[y][x] = self.current_player
-        captured = self.check_captures(x, y)
-        liberties = self.get_liberties(x, y)
-        has_liberties = len(liberties) > 0 if isinstance(liberties, set) else liberties > 0
-        
-        self.board_state[y][x] = None
-        return captured or has_liberties
+        return self.logic.is_legal(x, y)
 
-    
-
-    def calculate_territory(self):
-        """Calculate territory ownership"""
-        visited = [[False for _ in range(self.board_size)] for _ in range(self.board_size)]
-        self.territory = [[None for _ in range(self.board_size)] for _ in range(self.board_size)]
-        self.territory_score = {'black': 0, 'white': 0}
+    def probe_move(self, x, y):
+        """Preview a move (legality, captures, liberties) without changing the game"""
+        return self.logic.probe(x, y)
 
-        def flood_fill(x, y):
-            """Flood fill algorithm to determine territory ownership"""
-            if not (0 <= x < self.board_size and 0 <= y < self.board_size):
-                return set(), set()
-            if visited[y][x]:
-                return set(), set()
-            if self.board_state[y][x] is not None:
-                return set(), {self.board_state[y][x]}
-
-            visited[y][x] = True
-            empty_points = {(x, y)}
-            bordering_colors = set()
-
-            # Check all four directions
-            for dx, dy in self.directions:
-                new_x, new_y = x + dx, y + dy
-                if 0 <= new_x < self.board_size and 0 <= new_y < self.board_size:
-                    if self.board_state[new_y][new_x] is not None:
-                        # If we find a stone, add its color to bordering colors
-                        bordering_colors.add(self.board_state[new_y][new_x])
-                    else:
-                        # If empty, continue flood fill
-                        points, colors = flood_fill(new_x, new_y)
-                        empty_points.update(points)
-                        bordering_colors.update(colors)
-
-            return empty_points, bordering_colors
-
-        def is_completely_surrounded(points, color):
-            """Check if a set of points is completely surrounded by one color"""
-            for px, py in points:
-                for dx, dy in self.directions:
-                    nx, ny = px + dx, py + dy
-                    if (0 <= nx < self.board_size and 
-                        0 <= ny < self.board_size and 
-                        self.board_state[ny][nx] is not None and 
-                        self.board_state[ny][nx] != color):
-                        return False
-            return True
+    def position_key(self):
+        return self.logic.position_key()
 
-        # Find territories
-        for y in range(self.board_size):
-            for x in range(self.board_size):
-                if not visited[y][x] and self.board_state[y][x] is None:
-                    empty_points, bordering_colors = flood_fill(x, y)
-                    
-                    # Check if the area is completely surrounded by one color
-                    if len(bordering_colors) == 1:
-                        owner = bordering_colors.pop()
-                        if is_completely_surrounded(empty_points, owner):
-                            for px, py in empty_points:
-                                self.territory[py][px] = owner
-                                self.territory_score[owner] += 1
-                    else:
-                        # Mark as neutral territory
-                        for px, py in empty_points:
-                            self.territory[py][px] = None
-
-        # Add captures to final score
-        self.territory_score['black'] += self.captured_black
-        self.territory_score['white'] += self.captured_white
+    def calculate_territory(self, result=None):
+        """Calculate territory ownership, or take it from a finished scoring job"""
+        owner, counts = result if result is not None else self.logic.territory()
+        self.territory = self.logic.to_rows(owner)
+        # Captures are added separately by update_labels and end_game
+        self.territory_score = {name: counts[color] for name, color in COLORS.items()}
 
     def end_game(self):
-        """End the game and calculate final score"""
+        """End the game; the final score is shown once the worker has scored it"""
         try:
             self.timer.stop() 
+            self.clock.stop()
             self.game_ended = True
-            
+            self.cancel_engine_work()
+            self.worker.submit(scoring.territory, (bytes(self.logic.board), self.logic.width),
+                               self.show_final_score)
+        except Exception:
+            tracing.exception('end_game')
+
+    def show_final_score(self, territory):
+        """Show territory and the end game overlay for a scored position"""
+        try:
             # Calculate territory and captures
-            self.calculate_territory()
+            self.calculate_territory(territory)
             
             # Calculate final score including both territory and captures
             final_score = {
@@ -643,14 +576,14 @@ class GoBoard(QWidget):
             overlay.show()
             
             # Determine winner
-            if self.black_time <= 0:
-                winner = 'White'
-            elif self.white_time <= 0:
-                winner = 'Black'
+            flagged = self.clock.flagged()
+            if flagged is not None:
+                winner = COLOR_NAMES[opponent(flagged)].capitalize()
             else:
                 winner = 'Black' if final_score['black'] > final_score['white'] else 'White'
             
             # Create and show end game overlay with the same final score
+            from end_game import EndGameOverlay
             self.end_game_overlay = EndGameOverlay(
                 winner=winner,
                 final_score=final_score,  # Using the same final score
@@ -679,10 +612,8 @@ class GoBoard(QWidget):
             
             self.end_game_overlay.show()
             
-        except Exception as e:
-            print(f"Error in end_game: {e}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            tracing.exception('show_final_score')
 
 
     def preview_move(self, move_index):
@@ -691,67 +622,217 @@ class GoBoard(QWidget):
             # Save current state
             self.current_preview = move_index
             
-            # Reset board to initial state
-            self.board_state = [[None for _ in range(self.board_size)] for _ in range(self.board_size)]
-            
-            # Replay moves up to selected index
-            for i in range(move_index + 1):
-                if i < len(self.move_history):
-                    move = self.move_history[i]
-                    # Parse move text (format: "● Black: A1" or "○ White: B2")
-                    try:
-                        # Extract coordinates from move text
-                        parts = move.split(': ')[1]
-                        col = ord(parts[0]) - ord('A')
-                        row = int(parts[1:]) - 1
-                        color = 'black' if '●' in move else 'white'
-                        
-                        # Apply move
-                        self.board_state[row][col] = color
-                    except:
-                        # Skip non-move entries (like "Game Over!")
-                        continue
+            # Rebuild the position after the selected move from the nearest keyframe
+            self.preview_state = self.logic.to_rows(self.logic.log.board_at(move_index + 1))
             
             # Update display
             self.update_board()
             
-        except Exception as e:
-            print(f"Error in preview_move: {e}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            tracing.exception('preview_move')
 
     def setup_connections(self):
         """Set up button connections"""
         try:
             self.pass_btn.clicked.connect(self.pass_turn)
             self.reset_btn.clicked.connect(self.reset_board)
+            self.undo_btn.clicked.connect(self.undo_move)
+            self.redo_btn.clicked.connect(self.redo_move)
+            self.save_btn.clicked.connect(self.save_game)
+            self.open_btn.clicked.connect(self.open_game)
+            self.history_list.clicked.connect(lambda index: self.preview_move(index.row()))
             # Don't connect back_btn here as it's handled in go_game.py
-        except Exception as e:
-            print(f"Error setting up connections: {e}")
+        except Exception:
+            tracing.exception('setup_connections')
 
     def pass_turn(self):
         """Handle pass turn action"""
-        self.switch_player()
-        self.move_history.append(f"{self.current_player.capitalize()} passed")
+        if self.remote is not None and not self.remote_request('pass_move'):
+            return
+        self.logic.pass_move(self.clock_snapshot())
+        tracing.debug('pass')
+        self.clock.press()
+        self.update_timer()
         self.update_history()
         self.update_labels()
+        self.schedule_ai_move()
 
     def resign_game(self):
         """Handle resignation"""
-        winner = "White" if self.current_player == "black" else "Black"
-        self.move_history.append(f"{self.current_player.capitalize()} resigned. {winner} wins!")
+        if self.remote is not None and not self.remote_request('resign'):
+            return
+        self.logic.resign(self.clock_snapshot())
         self.update_history()
         # Here you could add game over logic
 
     def undo_move(self):
-        """Handle undo move action"""
-        if self.move_history:
-            self.move_history.pop()
-            # Here you would need to implement the actual board state reversal
-            self.switch_player()
-            self.update_history()
-            self.update_labels()
-            self.update()
+        """Take back the last move, restoring stones, captures and clocks"""
+        if self.game_ended or self.remote is not None:
+            return
+        self.cancel_engine_work()
+        record = self.logic.undo()
+        if record is not None:
+            self.clock.undo()
+        # Against the computer, take back its reply as well as our move
+        if record is not None and self.current_player == self.ai_color:
+            if self.logic.undo() is not None:
+                self.clock.undo()
+        if record is not None:
+            self.after_history_change()
+
+    def redo_move(self):
+        """Replay the last move taken back by undo_move"""
+        if self.game_ended or self.remote is not None:
+            return
+        self.cancel_engine_work()
+        record = self.logic.redo()
+        if record is not None:
+            self.clock.redo()
+        # Against the computer, replay its reply as well
+        if record is not None and self.current_player == self.ai_color:
+            if self.logic.redo() is not None:
+                self.clock.redo()
+        if record is not None:
+            self.after_history_change()
+
+    def after_history_change(self):
+        """Refresh the UI after undo or redo"""
+        self.preview_state = None
+        self.update_timer()
+        self.update_history()
+        self.update_labels()
+        self.update_board()
+        self.schedule_ai_move()
+
+    def save_game(self):
+        """Ask for a file name and save the game as SGF"""
+        path, _ = QFileDialog.getSaveFileName(self, "Save Game", "", "SGF files (*.sgf)")
+        if path:
+            try:
+                self.save_sgf(path)
+            except Exception:
+                tracing.exception('save_game', path=path)
+
+    def save_sgf(self, path):
+        import sgf
+        game = sgf.from_logic(self.logic, self.player1_name, self.player2_name)
+        sgf.write_games(path, [game])
+
+    def open_game(self):
+        """Ask for an SGF file and load its first game"""
+        path, _ = QFileDialog.getOpenFileName(self, "Open Game", "", "SGF files (*.sgf)")
+        if path:
+            try:
+                self.load_sgf(path)
+            except Exception:
+                tracing.exception('open_game', path=path)
+
+    def load_sgf(self, path):
+        """Replace the game with the first one in an SGF file.
+
+        The reader streams, so only that game is read from a large archive.
+        """
+        import sgf
+        games = sgf.read_games(path)
+        game = next(games, None)
+        games.close()
+        if game is None:
+            raise ValueError(f"No game found in {path}")
+        loaded = sgf.to_logic(game)
+        # The server game cannot follow a loaded record, so play on locally
+        self.disconnect_server()
+        self.cancel_engine_work()
+        if game.size != self.board_size:
+            self.set_board_size(game.size)
+        self.logic.replay(loaded.log)
+        if game.black or game.white:
+            self.player1_name, self.player2_name = game.black, game.white
+        self.game_ended = False
+        self.clock.reset()
+        self.clock.start(self.logic.to_move)
+        self.after_history_change()
+
+    def connect_server(self, host='127.0.0.1', port=7777):
+        """Start a new game hosted on a game server (python -m 12345 server)"""
+        self.disconnect_server()
+        self.reset_board()
+        control = self.clock.control
+        from client import RemoteGame
+        self.remote = RemoteGame(host, port, self.board_size, control=control._asdict())
+
+    def disconnect_server(self):
+        if self.remote is not None:
+            self.remote.close()
+            self.remote = None
+
+    def remote_request(self, action, *args, **fields):
+        """Call a RemoteGame method; False, after telling the user, if it failed"""
+        from client import ServerError
+        try:
+            getattr(self.remote, action)(*args, **fields)
+        except ServerError as e:
+            tracing.info('server_refused', action=action, error=str(e))
+            self.show_detection_popup(f"The server refused this: {e}")
+            return False
+        except OSError as e:
+            tracing.exception(action)
+            self.disconnect_server()
+            self.show_detection_popup(f"Lost the connection to the server ({e}); playing on locally.")
+            return False
+        return True
+
+    def restart_remote(self):
+        """Start a new server game to match a board that was just reset"""
+        if self.remote is not None:
+            self.remote_request('restart', self.board_size, control=self.clock.control._asdict())
+
+    def show_detection_popup(self, message):
+        """Tell the player why their action was not carried out"""
+        QMessageBox.warning(self, "Go", message)
+
+    def set_ai_player(self, color):
+        """Let the computer play 'black' or 'white'; None turns it off"""
+        self.ai_color = color
+        self.schedule_ai_move()
+
+    def schedule_ai_move(self):
+        """Start the computer thinking in the worker if it is its turn"""
+        if (self.ai_color is None or self.game_ended or self.ai_thinking
+                or self.current_player != self.ai_color):
+            return
+        time_left = self.clock.seconds_left(COLORS[self.ai_color])
+        self.ai_thinking = True
+        import mcts
+        self.worker.submit(mcts.think, (self.board_size, self.logic.log, time_left),
+                           self.ai_move_ready)
+
+    def ai_move_ready(self, result):
+        """Play the move the worker chose; its clock ran while it thought"""
+        self.ai_thinking = False
+        move, playouts, rate = result
+        perf.gauge('ai_playouts', playouts)
+        perf.gauge('ai_playouts_per_s', round(rate))
+        tracing.debug('ai_move', move=move, playouts=playouts)
+        try:
+            if self.game_ended or self.current_player != self.ai_color:
+                return
+            if move is None:
+                self.pass_turn()
+                self.check_game_end()
+            else:
+                self.make_move(*move)
+        except Exception:
+            tracing.exception('ai_move_ready')
+
+    def cancel_engine_work(self):
+        """Drop AI search and scoring that no longer match the board"""
+        self.worker.cancel()
+        self.ai_thinking = False
+
+    def hideEvent(self, event):
+        # Leaving the board stops the computer thinking about it
+        self.cancel_engine_work()
+        super().hideEvent(event)
 
     def switch_player(self):
         """Switch current player"""
@@ -762,31 +843,30 @@ class GoBoard(QWidget):
 
     def update_history(self):
         """Update move history list"""
-        self.history_list.clear()
-        self.history_list.addItems(self.move_history)
+        self.history_model.sync()
         self.history_list.scrollToBottom()
 
     # In board.py, modify the set_board_size method
     def set_board_size(self, size):
         """Change the board size and reset the game"""
         try:
-            print(f"Setting board size to: {size}")  # Debug print
-            if size not in [7, 9]:  # Changed from if size in [7, 9]:
-                raise ValueError(f"Invalid board size: {size}. Must be 7 or 9.")
+            tracing.debug('set_board_size', size=size)
+            if not MIN_BOARD_SIZE <= size <= MAX_BOARD_SIZE:
+                raise ValueError(f"Invalid board size: {size}. Must be between "
+                                 f"{MIN_BOARD_SIZE} and {MAX_BOARD_SIZE}.")
                 
             self.board_size = size
             # Reinitialize board state with new size
-            self.board_state = [[None for _ in range(size)] for _ in range(size)]
+            self.cancel_engine_work()
+            self.logic.reset(size)
+            self.restart_remote()
+            self.preview_state = None
             self.territory = [[None for _ in range(size)] for _ in range(size)]
             
             # Adjust cell size based on board size
             self.cell_size = min(600 // (size + 1), 60)
             
             # Reset game state
-            self.current_player = 'black'
-            self.captured_black = 0
-            self.captured_white = 0
-            self.move_history.clear()
             self.game_ended = False
             
             # Update coordinates for BoardCanvas
@@ -804,12 +884,9 @@ class GoBoard(QWidget):
                 self.board_canvas.update()
             
             self.update()
-            print(f"Board size updated successfully to {size}")  # Debug print
                 
-        except Exception as e:
-            print(f"Error in set_board_size: {e}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            tracing.exception('set_board_size')
 
 
     def reset_board(self):
@@ -821,64 +898,45 @@ class GoBoard(QWidget):
                 delattr(self, 'end_game_overlay')
             
             # Reset board state
-            self.board_state = [[None for _ in range(self.board_size)] for _ in range(self.board_size)]
+            self.cancel_engine_work()
+            self.logic.reset()
+            self.preview_state = None
             self.territory = [[None for _ in range(self.board_size)] for _ in range(self.board_size)]
             
             # Reset game variables
-            self.current_player = 'black'
             self.last_move = None
-            self.captured_black = 0
-            self.captured_white = 0
-            self.move_history.clear()
             self.game_ended = False
             
-            # Get timer duration from settings (in minutes) and convert to seconds
-            timer_duration = self.parent().parent().settings['timer_minutes'] * 60
-            
-            # Reset timers with settings value
-            self.black_time = timer_duration
-            self.white_time = timer_duration
-            
-            if hasattr(self, 'timer'):
-                self.timer.stop()
-            self.timer.start(1000)
+            # Reset the clock with the time control from the settings page
+            self.clock.reset(clock.from_settings(self.parent().parent().settings))
+            self.clock.start(self.logic.to_move)
+            self.restart_remote()
             
             # Update UI
-            self.update_timer_labels()
+            self.update_timer()
             self.update_history()
             self.update_labels()
             self.update_board()
+            self.schedule_ai_move()
             
             # Force a complete repaint
             self.repaint()
             
-        except Exception as e:
-            print(f"Error in reset_board: {e}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            tracing.exception('reset_board')
 
 
 
     def check_game_end(self):
         """Check if the game should end"""
         # Check for consecutive passes
-        if len(self.move_history) >= 2:
-            if self.move_history[-1].endswith("passed") and self.move_history[-2].endswith("passed"):
-                self.end_game()
-                return True
+        if self.logic.passes_in_a_row() >= 2:
+            self.end_game()
+            return True
                 
         # Check if no valid moves are left
-        valid_moves_exist = False
-        for y in range(self.board_size):
-            for x in range(self.board_size):
-                if self.board_state[y][x] is None and self.is_valid_move(x, y):
-                    valid_moves_exist = True
-                    break
-            if valid_moves_exist:
-                break
-                
-        if not valid_moves_exist:
-            self.move_history.append("No valid moves remaining")
+        if not self.logic.has_legal_move():
+            self.logic.no_moves(self.clock_snapshot())
             self.end_game()
             return True
             
@@ -887,62 +945,50 @@ class GoBoard(QWidget):
 
     def handle_detection(self, x, y):
         """Handle move validation and show appropriate messages"""
-        if not (0 <= x < self.board_size and 0 <= y < self.board_size):
-            self.show_detection_popup("Invalid move: Outside board boundaries!")
-            return False
-            
-        if self.board_state[y][x] is not None:
-            self.show_detection_popup("Invalid move: Space already occupied!")
+        reason = self.logic.check_move(x, y)
+        if reason is not None:
+            self.show_detection_popup(f"Invalid move: {reason}")
             return False
             
-        # Check for suicide move
-        self.board_state[y][x] = self.current_player
-        if self.get_liberties(x, y) == 0 and not self.check_captures(x, y):
-            self.board_state[y][x] = None
-            self.show_detection_popup("Invalid move: Suicide move not allowed!")
-            return False
-        self.board_state[y][x] = None
-            
         return True
     
 
 
     def update_board(self):
-        """Update the board display"""
+        """Repaint the intersections that changed"""
         if hasattr(self, 'board_canvas'):
-            self.board_canvas.update()
+            self.board_canvas.refresh()
 
 
     def update_timer(self):
-        """Update the game timer"""
-        if not self.game_ended:
-            if self.current_player == 'black':
-                self.black_time -= 1
-            else:
-                self.white_time -= 1
-            
+        """Check for a flag, refresh the labels and wait for the next visible change"""
+        if self.game_ended:
+            return
+        if self.clock.flagged() is not None:
+            self.handle_time_out()
+            return
+        if self.isVisible():
             self.update_timer_labels()
-            
-            # Check for time out
-            if self.black_time <= 0 or self.white_time <= 0:
-                self.handle_time_out()
+        running = self.clock.running
+        if running is not None:
+            self.timer.start(self.clock.ns_until_change(running) // 1_000_000 + 1)
 
     def update_timer_labels(self):
-        """Update the timer display labels"""
-        black_minutes = self.black_time // 60
-        black_seconds = self.black_time % 60
-        white_minutes = self.white_time // 60
-        white_seconds = self.white_time % 60
-        
-        self.black_timer_label.setText(f"Time: {black_minutes:02d}:{black_seconds:02d}")
-        self.white_timer_label.setText(f"Time: {white_minutes:02d}:{white_seconds:02d}")
+        """Update the timer display labels, only touching text that changed"""
+        for color, label in ((COLORS['black'], self.black_timer_label),
+                             (COLORS['white'], self.white_timer_label)):
+            text = f"Time: {self.clock.display(color)}"
+            if label.text() != text:
+                label.setText(text)
+        if self.clock.running is not None:
+            self.updateTimerSignal.emit(int(self.clock.seconds_left(self.clock.running)))
 
     def handle_time_out(self):
         """Handle when a player runs out of time"""
         self.timer.stop()
         self.game_ended = True
-        winner = "White" if self.black_time <= 0 else "Black"
-        self.move_history.append(f"Time Out! {winner} wins!")
+        self.clock.stop()
+        self.logic.time_out(self.clock.flagged() or self.logic.to_move, self.clock_snapshot())
         self.update_history()
         
         # Calculate final scores and show end game overlay
@@ -952,17 +998,34 @@ class GoBoard(QWidget):
     def keyPressEvent(self, event):
         if event.key() == Qt.Key.Key_Escape:
             self.close()
+        elif event.matches(QKeySequence.StandardKey.Undo):
+            self.undo_move()
+        elif event.matches(QKeySequence.StandardKey.Redo):
+            self.redo_move()
+        elif (event.key() == Qt.Key.Key_T and event.modifiers()
+              == Qt.KeyboardModifier.ControlModifier | Qt.KeyboardModifier.ShiftModifier):
+            self.dump_trace()
+
+    def dump_trace(self, path=None):
+        """Write the trace buffer to a JSON lines file (Ctrl+Shift+T)"""
+        path = path or time.strftime('go-trace-%Y%m%d-%H%M%S.jsonl')
+        count = tracing.dump(path)
+        tracing.info('trace_dumped', path=path, events=count)
+        return path
 
     def set_timer_duration(self, minutes):
         """Set the timer duration for both players"""
         try:
-            # Convert minutes to seconds
-            duration = minutes * 60
-            self.black_time = duration
-            self.white_time = duration
-            self.update_timer_labels()
-        except Exception as e:
-            print(f"Error setting timer duration: {e}")
+            self.set_time_control(self.clock.control._replace(main=minutes * 60))
+        except Exception:
+            tracing.exception('set_timer_duration')
+
+    def set_time_control(self, control):
+        """Start both clocks again with a clock.TimeControl"""
+        self.clock.reset(control)
+        self.clock.start(self.logic.to_move)
+        self.update_timer_labels()
+        self.update_timer()
 
 
     
@@ -1013,14 +1076,38 @@ class NoMovesDialog(QDialog):
         layout.addWidget(message)
         layout.addLayout(button_layout)
         self.setLayout(layout)
-    
 
 
+class MoveHistoryModel(QAbstractListModel):
+    """List model over the engine's move log; rows are formatted only when shown"""
 
+    def __init__(self, board):
+        super().__init__()
+        self.board = board
+        self.rows = 0
 
-    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.rows
 
-    
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and index.isValid():
+            return self.board.format_move(self.board.logic.log[index.row()])
+        return None
 
+    def sync(self):
+        """Tell the view about records added or removed since the last call"""
+        count = len(self.board.logic.log)
+        if count > self.rows:
+            self.beginInsertRows(QModelIndex(), self.rows, count - 1)
+            self.rows = count
+            self.endInsertRows()
+        elif count < self.rows:
+            self.beginRemoveRows(QModelIndex(), count, self.rows - 1)
+            self.rows = count
+            self.endRemoveRows()
 
-         
\ No newline at end of file
+    def refresh(self):
+        """Re-render every row, e.g. after the player names change"""
+        self.beginResetModel()
+        self.rows = len(self.board.logic.log)
+        self.endResetModel()
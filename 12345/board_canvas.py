@@ -0,0 +1,303 @@
+import math
+
+from PyQt6.QtWidgets import QWidget
+from PyQt6.QtCore import Qt, QPointF, QRectF
+from PyQt6.QtGui import QPainter, QPixmap, QColor, QPen, QBrush, QFont, QRadialGradient
+import perf
+from game_logic import COLUMNS
+
+
+def star_points(size):
+    """Hoshi positions for a board size (corners, sides on big boards, center)"""
+    if size < 7:
+        return []
+    edge = 2 if size < 13 else 3
+    lines = [edge, size - 1 - edge]
+    if size % 2 and size >= 15:
+        lines.insert(1, size // 2)
+    points = [(x, y) for x in lines for y in lines]
+    if size % 2 and (size // 2, size // 2) not in points:
+        points.append((size // 2, size // 2))
+    return points
+
+
+class BoardCanvas(QWidget):
+    """Draws the Go board and turns mouse clicks into moves.
+
+    The grid is laid out from the widget size and the board size, so any
+    board from 7x7 to 25x25 fills the available space.
+
+    Painting is layered: wood, grid, star points and coordinates are drawn
+    once into a pixmap at the screen's device pixel ratio, and stones are
+    copied from pre-rendered sprites. Both are rebuilt only when the
+    geometry or pixel ratio changes. refresh() repaints just the
+    intersections whose stone changed since it last ran.
+    """
+
+    def __init__(self, board):
+        super().__init__()
+        self.board = board
+        self.hover = None
+        self.hover_rects = []  # areas painted for the hover stone and its captures
+        self.background = None  # static layers, see static_layer()
+        self.sprites = {}  # color -> stone QPixmap for the current cell size
+        self.shown = None  # board_state rows as of the last refresh or full paint
+        self.shown_ended = False
+        self.shown_territory = None  # territory rows drawn with them
+        # Probes of hovered points for the position with key probes_key
+        self.probes = {}
+        self.probes_key = None
+        self.setMouseTracking(True)
+        self.setMinimumSize(300, 300)
+        self.update_coordinates()
+
+    def update_coordinates(self):
+        """Recompute the grid geometry for the current widget and board size"""
+        size = self.board.board_size
+        side = min(self.width(), self.height())
+        # A cell and a half of margin on each side holds the wood edge and coordinates
+        self.cell = side / (size + 2)
+        self.origin_x = (self.width() - self.cell * (size - 1)) / 2
+        self.origin_y = (self.height() - self.cell * (size - 1)) / 2
+        self.stars = star_points(size)
+        self.hover = None
+        self.hover_rects = []
+        self.background = None
+        self.sprites = {}
+        self.update()
+
+    def resizeEvent(self, event):
+        self.update_coordinates()
+        super().resizeEvent(event)
+
+    def to_pixel(self, x, y):
+        return QPointF(self.origin_x + x * self.cell, self.origin_y + y * self.cell)
+
+    def to_board(self, pos):
+        """Board coordinates of the intersection nearest to pos, or None"""
+        x = round((pos.x() - self.origin_x) / self.cell)
+        y = round((pos.y() - self.origin_y) / self.cell)
+        if 0 <= x < self.board.board_size and 0 <= y < self.board.board_size:
+            return x, y
+        return None
+
+    def point_rect(self, x, y):
+        """Widget pixels covered by a stone and its shadow at (x, y)"""
+        center = self.to_pixel(x, y)
+        half = self.cell * 0.6
+        return QRectF(center.x() - half, center.y() - half, 2 * half, 2 * half).toAlignedRect()
+
+    def refresh(self):
+        """Schedule a repaint of the intersections that changed since the last one"""
+        # The ghost stone belongs to the old position
+        if self.hover is not None:
+            self.set_hover(None)
+        state = self.board.board_state
+        ended = self.board.game_ended
+        territory = self.board.territory
+        # The territory overlay changes all at once when a game is scored
+        if (self.shown is None or ended != self.shown_ended or len(state) != len(self.shown)
+                or territory != self.shown_territory):
+            self.update()
+        else:
+            for y, (row, old) in enumerate(zip(state, self.shown)):
+                for x, (color, before) in enumerate(zip(row, old)):
+                    if color != before:
+                        self.update(self.point_rect(x, y))
+        self.remember_shown()
+
+    def paintEvent(self, event):
+        with perf.timed('paint'):
+            self.paint_layers(event)
+
+    def paint_layers(self, event):
+        rect = event.rect()
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        background = self.static_layer()
+        dpr = background.devicePixelRatio()
+        painter.drawPixmap(QRectF(rect), background,
+                           QRectF(rect.x() * dpr, rect.y() * dpr,
+                                  rect.width() * dpr, rect.height() * dpr))
+        self.draw_stones(painter, rect)
+        if self.board.game_ended:
+            self.draw_territory(painter)
+        elif self.hover is not None:
+            self.draw_hover(painter)
+        painter.end()
+        if rect.contains(self.rect()):
+            self.remember_shown()
+
+    def remember_shown(self):
+        """Note what is on screen, for refresh() to diff against"""
+        self.shown = [list(row) for row in self.board.board_state]
+        self.shown_ended = self.board.game_ended
+        territory = self.board.territory
+        self.shown_territory = [list(row) for row in territory] if territory is not None else None
+
+    def static_layer(self):
+        """Pixmap of the wood, grid, star points and coordinates"""
+        dpr = self.devicePixelRatioF()
+        if self.background is None or self.background.devicePixelRatio() != dpr:
+            background = QPixmap(math.ceil(self.width() * dpr), math.ceil(self.height() * dpr))
+            background.setDevicePixelRatio(dpr)
+            background.fill(Qt.GlobalColor.transparent)
+            painter = QPainter(background)
+            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+            self.draw_board(painter)
+            painter.end()
+            self.background = background
+            self.sprites = {}
+        return self.background
+
+    def draw_board(self, painter):
+        """Wood, grid lines, star points and coordinates"""
+        size = self.board.board_size
+        cell = self.cell
+        span = cell * (size - 1)
+        edge = cell * 0.6
+        painter.fillRect(QRectF(self.origin_x - edge, self.origin_y - edge,
+                                span + 2 * edge, span + 2 * edge), QColor('#DCB35C'))
+
+        painter.setPen(QPen(QColor('#3B2A14'), max(1.0, cell / 30)))
+        for i in range(size):
+            offset = i * cell
+            painter.drawLine(QPointF(self.origin_x, self.origin_y + offset),
+                             QPointF(self.origin_x + span, self.origin_y + offset))
+            painter.drawLine(QPointF(self.origin_x + offset, self.origin_y),
+                             QPointF(self.origin_x + offset, self.origin_y + span))
+
+        painter.setBrush(QColor('#3B2A14'))
+        radius = max(2.0, cell / 10)
+        for x, y in self.stars:
+            painter.drawEllipse(self.to_pixel(x, y), radius, radius)
+
+        font = QFont()
+        font.setPixelSize(max(8, int(cell * 0.3)))
+        painter.setFont(font)
+        painter.setPen(QColor('#ECF0F1'))
+        half = cell / 2
+        band = cell * 0.9
+        for i in range(size):
+            column = QRectF(self.origin_x + i * cell - half, self.origin_y - edge - band, cell, band)
+            painter.drawText(column, Qt.AlignmentFlag.AlignCenter, COLUMNS[i])
+            row = QRectF(self.origin_x - edge - band, self.origin_y + i * cell - half, band, cell)
+            painter.drawText(row, Qt.AlignmentFlag.AlignCenter, str(i + 1))
+
+    def stone_sprite(self, color):
+        """Pre-rendered stone with its shadow; the center sits at (radius + 1, radius + 1)"""
+        sprite = self.sprites.get(color)
+        if sprite is None:
+            dpr = self.devicePixelRatioF()
+            radius = self.cell * 0.46
+            side = math.ceil((radius * 2.12 + 2) * dpr)
+            sprite = QPixmap(side, side)
+            sprite.setDevicePixelRatio(dpr)
+            sprite.fill(Qt.GlobalColor.transparent)
+            painter = QPainter(sprite)
+            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+            self.paint_stone(painter, QPointF(radius + 1, radius + 1), radius, color)
+            painter.end()
+            self.sprites[color] = sprite
+        return sprite
+
+    def draw_stone(self, painter, x, y, color, opacity=1.0):
+        offset = self.cell * 0.46 + 1
+        painter.setOpacity(opacity)
+        painter.drawPixmap(self.to_pixel(x, y) - QPointF(offset, offset), self.stone_sprite(color))
+        painter.setOpacity(1.0)
+
+    def paint_stone(self, painter, center, radius, color):
+        # Shadow
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(QColor(0, 0, 0, 70))
+        painter.drawEllipse(center + QPointF(radius * 0.12, radius * 0.12), radius, radius)
+        # Stone with a soft highlight
+        gradient = QRadialGradient(center - QPointF(radius * 0.35, radius * 0.35), radius * 1.3)
+        if color == 'black':
+            gradient.setColorAt(0, QColor('#5A5A5A'))
+            gradient.setColorAt(1, QColor('#0B0B0B'))
+        else:
+            gradient.setColorAt(0, QColor('#FFFFFF'))
+            gradient.setColorAt(1, QColor('#C8C8C8'))
+        painter.setBrush(QBrush(gradient))
+        painter.drawEllipse(center, radius, radius)
+
+    def draw_stones(self, painter, rect):
+        """Stones whose sprites overlap rect"""
+        size = self.board.board_size
+        cell = self.cell
+        left = max(0, math.floor((rect.left() - self.origin_x) / cell - 0.6))
+        right = min(size - 1, math.ceil((rect.right() - self.origin_x) / cell + 0.6))
+        top = max(0, math.floor((rect.top() - self.origin_y) / cell - 0.6))
+        bottom = min(size - 1, math.ceil((rect.bottom() - self.origin_y) / cell + 0.6))
+        state = self.board.board_state
+        for y in range(top, bottom + 1):
+            row = state[y]
+            for x in range(left, right + 1):
+                if row[x] is not None:
+                    self.draw_stone(painter, x, y, row[x])
+
+    def draw_territory(self, painter):
+        """Small squares on the points each player owns at the end of the game"""
+        side = self.cell * 0.3
+        painter.setPen(Qt.PenStyle.NoPen)
+        for y, row in enumerate(self.board.territory):
+            for x, owner in enumerate(row):
+                if owner is not None:
+                    painter.setBrush(QColor('#111111' if owner == 'black' else '#F5F5F5'))
+                    center = self.to_pixel(x, y)
+                    painter.drawRect(QRectF(center.x() - side / 2, center.y() - side / 2, side, side))
+
+    def draw_hover(self, painter):
+        """Ghost stone, with a cross on each stone it would capture"""
+        self.draw_stone(painter, *self.hover, self.board.current_player, opacity=0.4)
+        captured = self.probe(self.hover).captured
+        if captured:
+            painter.setPen(QPen(QColor('#C0392B'), max(2.0, self.cell / 12)))
+            half = self.cell * 0.18
+            for x, y in captured:
+                center = self.to_pixel(x, y)
+                painter.drawLine(center - QPointF(half, half), center + QPointF(half, half))
+                painter.drawLine(center - QPointF(half, -half), center + QPointF(half, -half))
+
+    def probe(self, point):
+        """The board's probe of point, cached until the position changes"""
+        key = self.board.position_key()
+        if key != self.probes_key:
+            self.probes = {}
+            self.probes_key = key
+        result = self.probes.get(point)
+        if result is None:
+            result = self.probes[point] = self.board.probe_move(*point)
+        return result
+
+    def mousePressEvent(self, event):
+        if event.button() != Qt.MouseButton.LeftButton or self.board.game_ended:
+            return
+        point = self.to_board(event.position())
+        if point is not None:
+            self.board.make_move(*point)
+
+    def mouseMoveEvent(self, event):
+        point = self.to_board(event.position())
+        if point is not None and not self.probe(point).legal:
+            point = None
+        if point != self.hover:
+            self.set_hover(point)
+
+    def leaveEvent(self, event):
+        if self.hover is not None:
+            self.set_hover(None)
+
+    def set_hover(self, point):
+        """Move the hover stone, repainting only the intersections involved"""
+        for rect in self.hover_rects:
+            self.update(rect)
+        self.hover = point
+        self.hover_rects = []
+        if point is not None:
+            marked = [point] + self.probe(point).captured
+            self.hover_rects = [self.point_rect(*p) for p in marked]
+            for rect in self.hover_rects:
+                self.update(rect)
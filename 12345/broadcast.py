@@ -0,0 +1,123 @@
+"""Fan-out of game events to many watchers.
+
+Each applied move is published once as a small delta: who played where,
+which stones it captured, both clocks and the position hash. The delta
+is encoded to a JSON line a single time and the same bytes are queued
+for every subscriber, so the cost per watcher is one queue put. A full
+board is only sent as a snapshot when a watcher joins.
+
+Every subscriber has a bounded queue. A watcher that falls so far behind
+that its queue fills is cut off rather than allowed to hold memory or
+miss deltas silently; it receives END and can join again for a fresh
+snapshot.
+"""
+import asyncio
+import json
+
+from game_logic import COLOR_NAMES
+from move_log import PASS, RESIGN
+
+# Queued to a subscriber in place of further events when it is dropped
+END = None
+
+
+def encode(message):
+    return json.dumps(message, separators=(',', ':')).encode() + b'\n'
+
+
+def delta(game_id, logic, clock, result=None):
+    """Delta message for the last record in logic's move log.
+
+    clock is the (black, white) time left in milliseconds after the move.
+    """
+    record = logic.log[-1]
+    if record.is_stone:
+        move = list(logic.xy(record.point))
+    else:
+        move = 'pass' if record.point == PASS else 'resign' if record.point == RESIGN else 'other'
+    return {'type': 'delta', 'game': game_id, 'ply': len(logic.log), 'color': COLOR_NAMES[record.color],
+            'move': move, 'captured': [list(logic.xy(q)) for q in record.captured], 'clock': list(clock),
+            'hash': logic.hash, 'result': result}
+
+
+class Subscription:
+    """One watcher's bounded queue of encoded messages"""
+
+    def __init__(self, key, maxsize):
+        self.key = key
+        self.maxsize = maxsize
+        # One spare slot so END always fits behind what was queued
+        self.queue = asyncio.Queue(maxsize + 1)
+        self.dropped = False
+
+    def put(self, data):
+        """Queue data; False if the queue is full"""
+        if self.queue.qsize() >= self.maxsize:
+            return False
+        self.queue.put_nowait(data)
+        return True
+
+    def end(self):
+        self.queue.put_nowait(END)
+
+    async def get(self):
+        """Next encoded message, or END once unsubscribed or dropped"""
+        return await self.queue.get()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        data = await self.queue.get()
+        if data is END:
+            raise StopAsyncIteration
+        return data
+
+
+class Broadcaster:
+    """Subscribers grouped by key (a game id), each with a bounded queue"""
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.subscribers = {}  # key -> set of Subscription
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self, key, first=None, maxsize=None):
+        """New subscription to key, optionally starting with a first message"""
+        subscription = Subscription(key, maxsize or self.maxsize)
+        if first is not None:
+            subscription.put(encode(first))
+        self.subscribers.setdefault(key, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        subscribers = self.subscribers.get(subscription.key)
+        if subscribers is not None and subscription in subscribers:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self.subscribers[subscription.key]
+            subscription.end()
+
+    def publish(self, key, message):
+        """Send message to every subscriber of key; returns how many got it"""
+        subscribers = self.subscribers.get(key)
+        if not subscribers:
+            return 0
+        data = encode(message)
+        self.published += 1
+        lagging = [s for s in subscribers if not s.put(data)]
+        delivered = len(subscribers) - len(lagging)
+        for subscription in lagging:
+            subscription.dropped = True
+            self.dropped += 1
+            self.unsubscribe(subscription)
+        return delivered
+
+    def close(self, key):
+        """End every subscription to key, e.g. when its game is removed"""
+        for subscription in list(self.subscribers.get(key, ())):
+            self.unsubscribe(subscription)
+
+    def watchers(self, key):
+        return len(self.subscribers.get(key, ()))
@@ -0,0 +1,145 @@
+"""Clients for the game server's JSON lines protocol (see server.py).
+
+GameClient is the asyncio client used by the load generator; it lets
+many requests be in flight on one connection. RemoteGame is a small
+blocking client for the UI, which sends one request at a time.
+"""
+import asyncio
+import itertools
+import json
+import socket
+
+
+class ServerError(Exception):
+    """The server refused a request; the message is its error text"""
+
+
+def _result(reply):
+    if not reply.get('ok'):
+        raise ServerError(reply.get('error', 'request failed'))
+    return reply
+
+
+class GameClient:
+    """Pipelining asyncio client: replies are matched to requests by id.
+
+    Broadcasts from watched games (messages with a "type") are put on
+    the events queue.
+    """
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.ids = itertools.count(1)
+        self.pending = {}
+        self.events = asyncio.Queue()
+        self.receiver = asyncio.get_running_loop().create_task(self._receive())
+
+    @classmethod
+    async def connect(cls, host='127.0.0.1', port=7777, path=None):
+        if path:
+            reader, writer = await asyncio.open_unix_connection(path)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def _receive(self):
+        try:
+            while True:
+                line = await self.reader.readline()
+                if not line:
+                    break
+                reply = json.loads(line)
+                if 'type' in reply:
+                    self.events.put_nowait(reply)
+                    continue
+                future = self.pending.pop(reply.get('id'), None)
+                if future is not None and not future.done():
+                    future.set_result(reply)
+        finally:
+            for future in self.pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("server closed the connection"))
+            self.pending.clear()
+
+    async def request(self, op, **fields):
+        request_id = next(self.ids)
+        future = asyncio.get_running_loop().create_future()
+        self.pending[request_id] = future
+        self.writer.write(json.dumps({'id': request_id, 'op': op, **fields}).encode() + b'\n')
+        await self.writer.drain()
+        return _result(await future)
+
+    async def new_game(self, size=9, komi=7.5, control=None):
+        return (await self.request('new', size=size, komi=komi, control=control or {}))['game']
+
+    async def move(self, game, x, y):
+        return await self.request('move', game=game, x=x, y=y)
+
+    async def pass_move(self, game):
+        return await self.request('pass', game=game)
+
+    async def state(self, game):
+        return await self.request('state', game=game)
+
+    async def watch(self, game):
+        return await self.request('watch', game=game)
+
+    async def unwatch(self, game):
+        return await self.request('unwatch', game=game)
+
+    async def close(self):
+        self.writer.close()
+        self.receiver.cancel()
+        try:
+            await self.writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+class RemoteGame:
+    """Blocking connection to one hosted game, for GoBoard"""
+
+    def __init__(self, host='127.0.0.1', port=7777, size=9, komi=7.5, control=None, game=None,
+                 timeout=5.0):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.file = self.sock.makefile('rwb')
+        if game is None:
+            game = self.request('new', size=size, komi=komi, control=control or {})['game']
+        self.game = game
+
+    def request(self, op, **fields):
+        self.file.write(json.dumps({'op': op, **fields}).encode() + b'\n')
+        self.file.flush()
+        line = self.file.readline()
+        if not line:
+            raise ConnectionError("server closed the connection")
+        return _result(json.loads(line))
+
+    def move(self, x, y):
+        return self.request('move', game=self.game, x=x, y=y)
+
+    def pass_move(self):
+        return self.request('pass', game=self.game)
+
+    def resign(self):
+        return self.request('resign', game=self.game)
+
+    def state(self):
+        return self.request('state', game=self.game)
+
+    def restart(self, size=9, komi=7.5, control=None):
+        """Close the hosted game and start a new one on the same connection"""
+        try:
+            self.request('close', game=self.game)
+        except ServerError:
+            pass
+        self.game = self.request('new', size=size, komi=komi, control=control or {})['game']
+
+    def close(self):
+        try:
+            # Flushes anything unsent, which fails if the server has gone
+            self.file.close()
+        except ConnectionError:
+            pass
+        self.sock.close()
@@ -0,0 +1,180 @@
+"""Game clock driven by monotonic nanosecond timestamps.
+
+Time is charged only at move boundaries, as the difference between two
+time.monotonic_ns() readings, so a stalled UI thread can delay the
+display but never changes how much time a player used.
+"""
+import time
+from collections import namedtuple
+
+from game_logic import BLACK, WHITE, opponent
+
+NS = 1_000_000_000
+
+# main: seconds of main time; increment: Fischer seconds added after each
+# move; byoyomi: seconds per overtime period; periods: number of periods
+TimeControl = namedtuple('TimeControl', 'main increment byoyomi periods')
+
+
+def absolute(minutes):
+    return TimeControl(minutes * 60, 0, 0, 0)
+
+
+def fischer(minutes, increment):
+    return TimeControl(minutes * 60, increment, 0, 0)
+
+
+def byoyomi(minutes, seconds, periods):
+    return TimeControl(minutes * 60, 0, seconds, periods)
+
+
+def from_settings(settings):
+    """TimeControl from the settings page values (minutes plus optional extras)"""
+    minutes = settings.get('timer_minutes', 30)
+    if settings.get('byoyomi_periods'):
+        return byoyomi(minutes, settings.get('byoyomi_seconds', 30), settings['byoyomi_periods'])
+    if settings.get('increment_seconds'):
+        return fischer(minutes, settings['increment_seconds'])
+    return absolute(minutes)
+
+
+# What a player has left: main time and the current overtime period in
+# nanoseconds, the periods still unused, and whether they lost on time
+TimeLeft = namedtuple('TimeLeft', 'main periods period flagged')
+
+
+class GameClock:
+    """Two-player clock for absolute, Fischer and byo-yomi time controls.
+
+    press() ends the running player's move: the time since the last
+    boundary is charged, the increment is added or the byo-yomi period
+    reset, and the opponent's time starts. Every press is recorded so
+    undo() can put both players' time back exactly, and redo() restores
+    the times an undone press left without charging anyone again.
+    """
+
+    def __init__(self, control=None, now=time.monotonic_ns):
+        self.now = now
+        self.reset(control or absolute(30))
+
+    def reset(self, control=None):
+        if control is not None:
+            self.control = control
+        self.main = {BLACK: int(self.control.main * NS), WHITE: int(self.control.main * NS)}
+        self.periods = {BLACK: self.control.periods, WHITE: self.control.periods}
+        self.running = None
+        self.started = 0
+        self.history = []
+        self.redo_history = []
+
+    # ----- running -----
+
+    def start(self, color=BLACK):
+        self.running = color
+        self.started = self.now()
+
+    def stop(self):
+        """Charge the running player and stop the clock"""
+        if self.running is not None:
+            self._charge(self.running, self.now() - self.started)
+            self.running = None
+
+    def press(self):
+        """End the running player's move and start the opponent's time"""
+        if self.running is None:
+            return
+        now = self.now()
+        color = self.running
+        self.redo_history.clear()
+        self.history.append((color, dict(self.main), dict(self.periods)))
+        self._charge(color, now - self.started)
+        if not self.left(color).flagged:
+            if self.control.increment:
+                self.main[color] += int(self.control.increment * NS)
+        self.running = opponent(color)
+        self.started = now
+
+    def undo(self):
+        """Restore the time both players had before the last press"""
+        if not self.history:
+            return
+        self.redo_history.append((dict(self.main), dict(self.periods)))
+        color, self.main, self.periods = self.history.pop()
+        self.running = color
+        self.started = self.now()
+
+    def redo(self):
+        """Put back the time both players had after the last undone press"""
+        if not self.redo_history:
+            return
+        color = self.running
+        self.history.append((color, dict(self.main), dict(self.periods)))
+        self.main, self.periods = self.redo_history.pop()
+        self.running = opponent(color)
+        self.started = self.now()
+
+    def _charge(self, color, elapsed):
+        left = self._left(color, elapsed)
+        self.main[color] = left.main
+        self.periods[color] = left.periods
+
+    def _left(self, color, elapsed):
+        main = self.main[color] - elapsed
+        period = int(self.control.byoyomi * NS)
+        periods = self.periods[color]
+        if main >= 0:
+            return TimeLeft(main, periods, period, False)
+        if not period:
+            return TimeLeft(main, 0, 0, True)
+        # Each full period spent in overtime uses one up; a move made
+        # inside a period resets it
+        overtime = -main
+        periods -= overtime // period
+        return TimeLeft(0, periods, period - overtime % period, periods <= 0)
+
+    # ----- reading -----
+
+    def left(self, color, now=None):
+        """TimeLeft for color, counting the running move up to now"""
+        elapsed = 0
+        if color == self.running:
+            elapsed = (now if now is not None else self.now()) - self.started
+        return self._left(color, elapsed)
+
+    def seconds_left(self, color):
+        """Seconds color can use on the current move"""
+        left = self.left(color)
+        if left.flagged:
+            return 0.0
+        extra = left.period if left.main == 0 else 0
+        return (left.main + extra) / NS
+
+    def flagged(self):
+        """The color that has run out of time, or None"""
+        for color in (BLACK, WHITE):
+            if self.left(color).flagged:
+                return color
+        return None
+
+    def snapshot(self):
+        """(black, white) main time left in milliseconds, for the move log"""
+        return tuple(max(0, self.left(color).main) // 1_000_000 for color in (BLACK, WHITE))
+
+    def display(self, color):
+        """Clock text as shown to the players, e.g. '12:07' or '00:00 +3x0:21'"""
+        left = self.left(color)
+        seconds = -(-max(0, left.main) // NS)  # round up, like a chess clock
+        text = f"{seconds // 60:02d}:{seconds % 60:02d}"
+        if self.control.periods and not left.flagged:
+            if left.main == 0:
+                period = -(-left.period // NS)
+                text += f" +{left.periods}x{period // 60}:{period % 60:02d}"
+            else:
+                text += f" +{left.periods}x{int(self.control.byoyomi)}s"
+        return text
+
+    def ns_until_change(self, color):
+        """Nanoseconds until display(color) next changes while it runs"""
+        left = self.left(color)
+        value = left.main if left.main > 0 or not left.period else left.period
+        return value % NS or NS
@@ -0,0 +1,217 @@
+"""Local SQLite game store with every position indexed by Zobrist hash.
+
+python -m 12345 db ingest games.sgf more_games/ --db games.db
+python -m 12345 db stats --db games.db
+"""
+import argparse
+import sqlite3
+import sys
+import time
+from array import array
+from collections import namedtuple
+
+import sgf
+from game_logic import GameLogic, EMPTY, BLACK, opponent
+from move_log import PASS
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    size INTEGER NOT NULL,
+    komi REAL,
+    result TEXT,
+    black TEXT,
+    white TEXT,
+    colors BLOB NOT NULL,
+    points BLOB NOT NULL,
+    setup BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS positions (
+    hash INTEGER NOT NULL,
+    color INTEGER NOT NULL,
+    game INTEGER NOT NULL,
+    ply INTEGER NOT NULL,
+    next INTEGER
+);
+CREATE INDEX IF NOT EXISTS positions_by_hash ON positions (hash, color, next);
+"""
+
+# One row of next_moves(): move is (x, y) or None for a pass; wins counts
+# games won by the player who made it
+MoveStats = namedtuple('MoveStats', 'move count wins')
+GameRow = namedtuple('GameRow', 'id size black white result ply')
+
+
+def signed64(value):
+    """SQLite integers are signed, so store 64-bit hashes two's complement"""
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def positions(game):
+    """(hash, color to move, ply, next point) for each position in a game.
+
+    The stones are replayed on a GameLogic with make(); the game stops at
+    the first move that is not playable, so damaged records still index
+    the positions before it. next is None for the final position.
+    """
+    logic = GameLogic(game.size, superko=False)
+    for color, x, y in game.setup:
+        if x is not None and logic.on_board(x, y) and logic.board[logic.point(x, y)] == EMPTY:
+            logic.make(logic.point(x, y), color)
+    color = game.moves[0][0] if game.moves else BLACK
+    rows = []
+    for ply, (color, x, y) in enumerate(game.moves):
+        if x is None:
+            point = PASS
+        else:
+            if not logic.on_board(x, y):
+                break
+            point = logic.point(x, y)
+            if logic.board[point] != EMPTY or not logic.is_not_suicide(point, color):
+                break
+        rows.append((signed64(logic.hash), color, ply, point))
+        if point == PASS:
+            logic.make_pass(color)
+        else:
+            logic.make(point, color)
+        color = opponent(color)
+    rows.append((signed64(logic.hash), color, len(rows), None))
+    return rows
+
+
+class GameDB:
+    """Games and their positions in one SQLite file"""
+
+    def __init__(self, path):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        # Games add_games() could not read, e.g. with a bad point or size
+        self.skipped = 0
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def add_games(self, games, batch=1000):
+        """Store games in transactions of batch games.
+
+        games is any iterable of SgfGame or of SGF game texts, such as
+        sgf.read_texts() output. A game that cannot be parsed or replayed
+        is skipped and counted in self.skipped instead of aborting the
+        batch. Returns the number of games stored.
+        """
+        count = 0
+        cursor = self.connection.cursor()
+        pending = 0
+        cursor.execute("BEGIN")
+        for game in games:
+            try:
+                if isinstance(game, str):
+                    game = sgf.parse_game(game)
+                self._insert(cursor, game)
+            except (ValueError, IndexError):
+                self.skipped += 1
+                continue
+            count += 1
+            pending += 1
+            if pending == batch:
+                cursor.execute("COMMIT")
+                cursor.execute("BEGIN")
+                pending = 0
+        cursor.execute("COMMIT")
+        return count
+
+    def _insert(self, cursor, game):
+        # Replayed first so that a game which fails leaves no row behind
+        rows = positions(game)
+        width = game.size + 2
+        colors = array('b', (color for color, _, _ in game.moves))
+        points = array('h', (PASS if x is None else (y + 1) * width + x + 1
+                             for _, x, y in game.moves))
+        setup = array('h', (color * 1000 + (y + 1) * width + x + 1
+                            for color, x, y in game.setup if x is not None))
+        cursor.execute("INSERT INTO games (size, komi, result, black, white, colors, points, setup)"
+                       " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                       (game.size, game.komi, game.result, game.black, game.white,
+                        colors.tobytes(), points.tobytes(), setup.tobytes()))
+        game_id = cursor.lastrowid
+        cursor.executemany("INSERT INTO positions (hash, color, game, ply, next) VALUES (?, ?, ?, ?, ?)",
+                           [(h, color, game_id, ply, point) for h, color, ply, point in rows])
+
+    def game(self, game_id):
+        """The stored game as an SgfGame, or None"""
+        row = self.connection.execute(
+            "SELECT size, komi, result, black, white, colors, points, setup FROM games WHERE id = ?",
+            (game_id,)).fetchone()
+        if row is None:
+            return None
+        size, komi, result, black, white, colors, points, setup = row
+        width = size + 2
+        colors = array('b', colors)
+        points = array('h', points)
+        moves = [(color, None, None) if point == PASS else (color, point % width - 1, point // width - 1)
+                 for color, point in zip(colors, points)]
+        stones = [(code // 1000, code % 1000 % width - 1, code % 1000 // width - 1)
+                  for code in array('h', setup)]
+        return sgf.SgfGame(size, komi, result, black, white, moves, stones)
+
+    def games_reaching(self, position_hash, color, limit=100):
+        """Games that reached a position with color to move, earliest ply first"""
+        rows = self.connection.execute(
+            "SELECT g.id, g.size, g.black, g.white, g.result, MIN(p.ply) FROM positions p"
+            " JOIN games g ON g.id = p.game WHERE p.hash = ? AND p.color = ?"
+            " GROUP BY g.id ORDER BY g.id LIMIT ?",
+            (signed64(position_hash), color, limit))
+        return [GameRow(*row) for row in rows]
+
+    def next_moves(self, position_hash, color, size):
+        """How often each move was played from a position, most frequent first"""
+        width = size + 2
+        winner = 'B+%' if color == BLACK else 'W+%'
+        rows = self.connection.execute(
+            "SELECT p.next, COUNT(*), SUM(g.result LIKE ?) FROM positions p"
+            " JOIN games g ON g.id = p.game WHERE p.hash = ? AND p.color = ? AND p.next IS NOT NULL"
+            " GROUP BY p.next ORDER BY COUNT(*) DESC",
+            (winner, signed64(position_hash), color))
+        return [MoveStats(None if point == PASS else (point % width - 1, point // width - 1),
+                          count, wins or 0)
+                for point, count, wins in rows]
+
+    def explore(self, logic):
+        """next_moves() for the current position of a GameLogic"""
+        return self.next_moves(logic.hash, logic.to_move, logic.size)
+
+    def stats(self):
+        games = self.connection.execute("SELECT COUNT(*) FROM games").fetchone()[0]
+        count = self.connection.execute("SELECT COUNT(*) FROM positions").fetchone()[0]
+        return games, count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m 12345 db', description='Local game database.')
+    parser.add_argument('command', choices=('ingest', 'stats'))
+    parser.add_argument('sources', nargs='*', help='SGF files or directories to ingest')
+    parser.add_argument('--db', default='games.db')
+    parser.add_argument('--batch', type=int, default=1000, help='games per transaction')
+    args = parser.parse_args(argv)
+
+    with GameDB(args.db) as db:
+        if args.command == 'ingest':
+            start = time.perf_counter()
+            added = 0
+            for source in args.sources:
+                added += db.add_games(sgf.read_texts(source), args.batch)
+            elapsed = time.perf_counter() - start
+            skipped = f", skipped {db.skipped} unreadable" if db.skipped else ""
+            print(f"Added {added} games in {elapsed:.1f}s{skipped}", file=sys.stderr)
+        games, count = db.stats()
+        print(f"{games} games, {count} positions in {args.db}")
+    return 0
@@ -1,3 +1,553 @@
+import random
+from collections import Counter, namedtuple
+
+import scoring
+from move_log import MoveLog, PASS, RESIGN, TIMEOUT, NO_MOVES
+from piece import Piece
+
+# Point values stored in the flat board array
+EMPTY = Piece.NoPiece
+WHITE = Piece.White
+BLACK = Piece.Black
+BORDER = Piece.Border
+
+COLOR_NAMES = {BLACK: 'black', WHITE: 'white'}
+COLORS = {'black': BLACK, 'white': WHITE}
+
+MIN_BOARD_SIZE = 2
+MAX_BOARD_SIZE = 25
+# Go board columns skip the letter I
+COLUMNS = 'ABCDEFGHJKLMNOPQRSTUVWXYZ'
+
+
+def point_label(x, y):
+    """Human readable name of a point, e.g. 'J10'"""
+    return f"{COLUMNS[x]}{y + 1}"
+
+
+def opponent(color):
+    """Return the other player's color"""
+    return BLACK + WHITE - color
+
+
+class IllegalMoveError(ValueError):
+    """Raised when a move breaks the rules of Go"""
+
+
+# Result of GameLogic.probe(): captured is a list of (x, y) points and
+# liberties the liberty count of the new stone's chain
+Probe = namedtuple('Probe', 'legal reason captured liberties')
+
+
+_zobrist_tables = {}
+
+
+def zobrist_table(width):
+    """64-bit Zobrist keys indexed [color][point] for a padded board width.
+
+    Keys are seeded by the width so every process hashes the same position
+    to the same value, which lets hashes key caches and stored games.
+    """
+    table = _zobrist_tables.get(width)
+    if table is None:
+        rng = random.Random(width)
+        table = [None] * (max(BLACK, WHITE) + 1)
+        for color in (BLACK, WHITE):
+            table[color] = [rng.getrandbits(64) for _ in range(width * width)]
+        _zobrist_tables[width] = table
+    return table
+
+
+class Chain:
+    """A connected group of stones with its liberties and Zobrist hash"""
+    __slots__ = ('color', 'stones', 'liberties', 'hash')
+
+    def __init__(self, color, stones, liberties, hash):
+        self.color = color
+        self.stones = stones
+        self.liberties = liberties
+        self.hash = hash
+
+
 class GameLogic:
-    print("Game Logic Object Created")
-    # TODO add code here to manage the logic of your game
+    """Qt-free rules engine for Go.
+
+    The position is a flat bytearray with a one point border around the
+    board, so a point index p has neighbours p - 1, p + 1, p - width and
+    p + width and never needs bounds checks. Chains are kept up to date
+    as stones are placed and captured, so liberty and capture checks only
+    look at the neighbours of a move. The set of legal points for each
+    color is refreshed only around the stones a move touched.
+
+    Each position also carries an incremental Zobrist hash. Simple ko is
+    always enforced and, with superko=True, so is positional superko
+    (no move may recreate an earlier board position).
+    """
+
+    def __init__(self, size=9, superko=True):
+        self.superko = superko
+        self.reset(size)
+
+    def reset(self, size=None):
+        """Clear the board, optionally changing its size"""
+        if size is not None:
+            if not MIN_BOARD_SIZE <= size <= MAX_BOARD_SIZE:
+                raise ValueError(f"Invalid board size: {size}. Must be between "
+                                 f"{MIN_BOARD_SIZE} and {MAX_BOARD_SIZE}.")
+            self.size = size
+        self.width = self.size + 2
+        self.board = bytearray([BORDER]) * (self.width * self.width)
+        for y in range(self.size):
+            start = self.point(0, y)
+            self.board[start:start + self.size] = bytes(self.size)
+        self.chains = [None] * len(self.board)  # point -> Chain
+        self.offsets = (-self.width, -1, 1, self.width)
+        self.to_move = BLACK
+        self.captures = {BLACK: 0, WHITE: 0}  # stones captured *by* each color
+        self.stack = []  # undo entries pushed by make() and make_pass()
+        self.redo_stack = []  # MoveRecords taken back by undo()
+        self.zobrist = zobrist_table(self.width)
+        self.hash = 0
+        self.ko = None  # (point, color) that color may not retake right now
+        self.seen = Counter([self.hash])  # hashes of positions reached by play()
+        self.log = MoveLog()
+        self.log.clear(self.board)
+        empty = set(self.points())
+        self.legal = {BLACK: empty, WHITE: set(empty)}
+
+    # ----- coordinates -----
+
+    def point(self, x, y):
+        """Convert board coordinates to a flat point index"""
+        return (y + 1) * self.width + x + 1
+
+    def xy(self, p):
+        """Convert a flat point index back to board coordinates"""
+        y, x = divmod(p, self.width)
+        return x - 1, y - 1
+
+    def on_board(self, x, y):
+        return 0 <= x < self.size and 0 <= y < self.size
+
+    def points(self):
+        """All on-board point indices"""
+        return [p for p in range(len(self.board)) if self.board[p] != BORDER]
+
+    def color_at(self, x, y):
+        return self.board[self.point(x, y)]
+
+    # ----- groups -----
+
+    def group(self, p):
+        """Return (stones, liberties) of the chain containing point p"""
+        chain = self.chains[p]
+        return chain.stones, chain.liberties
+
+    def liberties(self, x, y):
+        """Set of (x, y) liberties of the chain at (x, y)"""
+        chain = self.chains[self.point(x, y)]
+        if chain is None:
+            return set()
+        return {self.xy(q) for q in chain.liberties}
+
+    def liberty_count(self, x, y):
+        chain = self.chains[self.point(x, y)]
+        return len(chain.liberties) if chain is not None else 0
+
+    def find_group(self, x, y):
+        """Set of (x, y) stones connected to (x, y)"""
+        chain = self.chains[self.point(x, y)]
+        if chain is None:
+            return set()
+        return {self.xy(q) for q in chain.stones}
+
+    # ----- moves -----
+
+    def is_not_suicide(self, p, color):
+        """True if an empty point p is not suicide for color"""
+        board = self.board
+        chains = self.chains
+        for d in self.offsets:
+            n = p + d
+            value = board[n]
+            if value == EMPTY:
+                return True
+            if value == BORDER:
+                continue
+            # A friendly chain must keep another liberty, an enemy chain
+            # in atari is captured
+            if (len(chains[n].liberties) > 1) == (value == color):
+                return True
+        return False
+
+    def fills_own_eye(self, p, color):
+        """True if every neighbour of p is color's own stone or the edge"""
+        board = self.board
+        return all(board[p + d] in (color, BORDER) for d in self.offsets)
+
+    def check_move(self, x, y, color=None):
+        """Return the reason a move is illegal, or None if it is legal"""
+        if color is None:
+            color = self.to_move
+        if not self.on_board(x, y):
+            return "Outside board boundaries!"
+        p = self.point(x, y)
+        if self.board[p] != EMPTY:
+            return "Space already occupied!"
+        if not self.is_not_suicide(p, color):
+            return "Suicide move not allowed!"
+        if self.ko == (p, color):
+            return "Ko: the stone cannot be recaptured immediately!"
+        if self.repeats_position(p, color):
+            return "Superko: the move repeats an earlier position!"
+        return None
+
+    def is_legal(self, x, y, color=None):
+        if color is None:
+            color = self.to_move
+        if not self.on_board(x, y):
+            return False
+        p = self.point(x, y)
+        return p in self.legal[color] and not self.repeats_position(p, color)
+
+    def hash_after(self, p, color):
+        """Zobrist hash of the position after color plays on empty point p"""
+        h = self.hash ^ self.zobrist[color][p]
+        captured = []
+        for d in self.offsets:
+            chain = self.chains[p + d]
+            if (chain is not None and chain.color != color
+                    and len(chain.liberties) == 1 and chain not in captured):
+                captured.append(chain)
+                h ^= chain.hash
+        return h
+
+    def repeats_position(self, p, color):
+        """True if the move would break positional superko"""
+        return self.superko and self.hash_after(p, color) in self.seen
+
+    def make(self, p, color):
+        """Put a stone on p, merging and capturing chains.
+
+        No legality checks are made. The change is pushed on the undo stack
+        so unmake() can reverse it exactly; returns the captured chains.
+        """
+        board = self.board
+        chains = self.chains
+        key = self.zobrist[color][p]
+        board[p] = color
+        friends = []
+        enemies = []
+        liberties = set()
+        for d in self.offsets:
+            n = p + d
+            value = board[n]
+            if value == EMPTY:
+                liberties.add(n)
+            elif value == color:
+                if chains[n] not in friends:
+                    friends.append(chains[n])
+            elif value != BORDER and chains[n] not in enemies:
+                enemies.append(chains[n])
+
+        if friends:
+            # Merge everything into the largest neighbouring chain, noting
+            # what it gained so unmake() can split it again
+            base = max(friends, key=lambda chain: len(chain.stones))
+            base_size = len(base.stones)
+            absorbed = [chain for chain in friends if chain is not base]
+            added = liberties
+            for other in absorbed:
+                base.hash ^= other.hash
+                added |= other.liberties
+                base.stones.extend(other.stones)
+                for q in other.stones:
+                    chains[q] = base
+            added -= base.liberties
+            added.discard(p)
+            base.stones.append(p)
+            base.hash ^= key
+            base.liberties |= added
+            base.liberties.discard(p)
+        else:
+            base = Chain(color, [p], liberties, key)
+            base_size = 0
+            absorbed = added = None
+        chains[p] = base
+
+        captured = []
+        h = self.hash ^ key
+        for chain in enemies:
+            chain.liberties.discard(p)
+            if not chain.liberties:
+                captured.append(chain)
+                self._remove(chain)
+                self.captures[color] += len(chain.stones)
+                h ^= chain.hash
+        self.stack.append((p, color, base, base_size, absorbed, added, enemies, captured,
+                           self.hash, self.ko))
+
+        # A lone stone that took a lone stone and sits in atari is a ko:
+        # the opponent may not take it back at once
+        self.hash = h
+        self.ko = None
+        if (len(captured) == 1 and len(captured[0].stones) == 1
+                and len(base.stones) == 1 and len(base.liberties) == 1):
+            self.ko = (captured[0].stones[0], opponent(color))
+        return captured
+
+    def make_pass(self, color):
+        """Pass for color, lifting any ko; undone by unmake() like a stone"""
+        self.stack.append((None, color, None, 0, None, None, (), (), self.hash, self.ko))
+        self.ko = None
+
+    def unmake(self):
+        """Reverse the last make(), restoring chains, liberties and captures.
+
+        Also restores the hash and ko state; returns the point that was
+        played (None for a pass) and the chains it had captured.
+        """
+        (p, color, base, base_size, absorbed, added, enemies, captured,
+         self.hash, self.ko) = self.stack.pop()
+        if p is None:
+            return None, captured
+        board = self.board
+        chains = self.chains
+        enemy = opponent(color)
+        for chain in captured:
+            for q in chain.stones:
+                board[q] = enemy
+                chains[q] = chain
+            for q in chain.stones:
+                for d in self.offsets:
+                    neighbour = chains[q + d]
+                    if neighbour is not None and neighbour.color == color:
+                        neighbour.liberties.discard(q)
+            self.captures[color] -= len(chain.stones)
+        for chain in enemies:
+            chain.liberties.add(p)
+
+        board[p] = EMPTY
+        chains[p] = None
+        if absorbed is not None:
+            del base.stones[base_size:]
+            base.liberties -= added
+            base.liberties.add(p)
+            for other in absorbed:
+                base.hash ^= other.hash
+                for q in other.stones:
+                    chains[q] = other
+            base.hash ^= self.zobrist[color][p]
+        return p, captured
+
+    def _remove(self, chain):
+        """Take a captured chain off the board, freeing liberties around it"""
+        board = self.board
+        chains = self.chains
+        for q in chain.stones:
+            board[q] = EMPTY
+            chains[q] = None
+        for q in chain.stones:
+            for d in self.offsets:
+                neighbour = chains[q + d]
+                if neighbour is not None:
+                    neighbour.liberties.add(q)
+
+    def play(self, x, y, clock=(0, 0)):
+        """Place a stone for the player to move.
+
+        clock is the (black, white) time left in milliseconds, kept in the
+        move log. Returns the list of captured (x, y) points and raises
+        IllegalMoveError if the move is not allowed.
+        """
+        reason = self.check_move(x, y)
+        if reason is not None:
+            raise IllegalMoveError(reason)
+        self.redo_stack.clear()
+        return self._play(self.point(x, y), clock)
+
+    def _play(self, p, clock):
+        color = self.to_move
+        old_ko = self.ko
+        captured = [q for chain in self.make(p, color) for q in chain.stones]
+        self.to_move = opponent(color)
+        self.seen[self.hash] += 1
+        self._refresh_after(p, captured, old_ko)
+        self.log.append(color, p, captured, clock, self.board)
+        return [self.xy(q) for q in captured]
+
+    def _refresh_after(self, p, captured, old_ko):
+        """Update the legal move sets after p and captured changed color"""
+        touched = self._touched(p, captured)
+        for ko in (old_ko, self.ko):
+            if ko is not None:
+                touched.add(ko[0])
+        self._refresh_legal(touched)
+
+    def probe(self, x, y, color=None):
+        """Report what playing at (x, y) would do without changing the game"""
+        if color is None:
+            color = self.to_move
+        reason = self.check_move(x, y, color)
+        if reason is not None:
+            return Probe(False, reason, [], 0)
+        p = self.point(x, y)
+        captured = [self.xy(q) for chain in self.make(p, color) for q in chain.stones]
+        liberties = len(self.chains[p].liberties)
+        self.unmake()
+        return Probe(True, None, captured, liberties)
+
+    def _touched(self, p, captured):
+        """Points whose legality may have changed after a move at p.
+
+        Only points next to a stone that was placed or removed, and the
+        liberties of chains next to those stones, can change.
+        """
+        chains = self.chains
+        touched = set(captured)
+        touched.add(p)
+        seen = set()
+        for q in touched.copy():
+            for n in (q,) + tuple(q + d for d in self.offsets):
+                chain = chains[n]
+                if chain is None:
+                    touched.add(n)
+                elif chain not in seen:
+                    seen.add(chain)
+                    touched |= chain.liberties
+        return touched
+
+    def _refresh_legal(self, points):
+        board = self.board
+        for color, legal in self.legal.items():
+            for q in points:
+                if board[q] == EMPTY and self.is_not_suicide(q, color) and self.ko != (q, color):
+                    legal.add(q)
+                else:
+                    legal.discard(q)
+
+    def pass_move(self, clock=(0, 0)):
+        """Hand the turn to the other player, which also lifts any ko"""
+        self.redo_stack.clear()
+        self._pass(clock)
+
+    def _pass(self, clock):
+        ko = self.ko
+        self.make_pass(self.to_move)
+        self.log.append(self.to_move, PASS, clock=clock)
+        self.to_move = opponent(self.to_move)
+        if ko is not None:
+            self._refresh_legal([ko[0]])
+
+    def position_key(self):
+        """Changes whenever a move, pass, undo, redo or reset changes the game"""
+        return self.size, self.hash, self.to_move, len(self.log)
+
+    def replay(self, log):
+        """Reset and play through the stones and passes of another MoveLog"""
+        self.reset()
+        for record in log:
+            self.to_move = record.color
+            if record.is_stone:
+                self._play(record.point, record.clock)
+            elif record.is_pass:
+                self._pass(record.clock)
+
+    def resign(self, clock=(0, 0)):
+        """Record that the player to move gave up"""
+        self._end_record(self.to_move, RESIGN, clock)
+
+    def no_moves(self, clock=(0, 0)):
+        """Record that the player to move had no legal move left"""
+        self._end_record(self.to_move, NO_MOVES, clock)
+
+    def time_out(self, color, clock=(0, 0)):
+        """Record that color ran out of time"""
+        self._end_record(color, TIMEOUT, clock)
+
+    def _end_record(self, color, point, clock):
+        # The board does not change, so only the redo stack needs updating;
+        # undo() and redo() move these records like any other
+        self.redo_stack.clear()
+        self.log.append(color, point, clock=clock)
+
+    def undo(self):
+        """Take back the last record of the game log.
+
+        Only the stones the move placed and captured are touched. Returns
+        the MoveRecord that was undone, or None if the log is empty.
+        """
+        if not len(self.log):
+            return None
+        record = self.log.pop()
+        self.redo_stack.append(record)
+        if record.point == PASS or record.is_stone:
+            if record.is_stone:
+                self.seen[self.hash] -= 1
+                if not self.seen[self.hash]:
+                    del self.seen[self.hash]
+            old_ko = self.ko
+            p, captured = self.unmake()
+            self.to_move = record.color
+            if p is None:
+                if self.ko is not None:
+                    self._refresh_legal([self.ko[0]])
+            else:
+                self._refresh_after(p, [q for chain in captured for q in chain.stones], old_ko)
+        return record
+
+    def redo(self):
+        """Replay the last undone record; returns it, or None if there is none"""
+        if not self.redo_stack:
+            return None
+        record = self.redo_stack.pop()
+        if record.is_stone:
+            self._play(record.point, record.clock)
+        elif record.point == PASS:
+            self._pass(record.clock)
+        else:
+            self.log.append(record.color, record.point, clock=record.clock)
+        return record
+
+    def passes_in_a_row(self):
+        """Number of consecutive passes at the end of the game record"""
+        count = 0
+        for point in reversed(self.log.points):
+            if point != PASS:
+                break
+            count += 1
+        return count
+
+    def legal_moves(self, color=None):
+        """List of (x, y) points the player may play"""
+        if color is None:
+            color = self.to_move
+        return [self.xy(p) for p in sorted(self.legal[color])
+                if not self.repeats_position(p, color)]
+
+    def has_legal_move(self, color=None):
+        if color is None:
+            color = self.to_move
+        # Superko is rare, so this normally stops at the first point
+        return any(not self.repeats_position(p, color) for p in self.legal[color])
+
+    # ----- scoring -----
+
+    def territory(self):
+        """Return (owner, counts) for empty regions bordered by one color.
+
+        owner is a bytearray in the board's layout holding BLACK, WHITE or
+        EMPTY for each point; counts maps each color to its territory.
+        """
+        return scoring.territory(self.board, self.width)
+
+    def score(self, rules='territory', komi=0.0):
+        """Score the current position under area or territory rules"""
+        return scoring.score(self.board, self.width, self.captures, komi, rules)
+
+    def to_rows(self, board=None):
+        """Board (default: the current one) as rows of 'black', 'white' or None"""
+        if board is None:
+            board = self.board
+        return [[COLOR_NAMES.get(board[self.point(x, y)]) for x in range(self.size)]
+                for y in range(self.size)]
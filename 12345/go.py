@@ -1,6 +1,6 @@
 from PyQt6.QtWidgets import QMainWindow
 from PyQt6.QtCore import Qt
-from board import Board
+from board import GoBoard
 from score_board import ScoreBoard
 
 class Go(QMainWindow):
@@ -17,7 +17,7 @@ class Go(QMainWindow):
 
     def initUI(self):
         '''initiates application UI'''
-        self.board = Board(self)
+        self.board = GoBoard()
         self.setCentralWidget(self.board)
         self.scoreBoard = ScoreBoard()
         self.addDockWidget(Qt.DockWidgetArea.RightDockWidgetArea, self.scoreBoard)
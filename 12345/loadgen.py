@@ -0,0 +1,109 @@
+"""Load generator for the game server.
+
+python -m 12345 loadgen --games 200 --connections 20
+
+Seeded random games are recorded up front, then replayed against the
+server over several connections with every game's moves sent as soon as
+the previous reply arrives. Reports moves per second and the latency of
+each move request.
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+
+from bench import record_game
+from client import GameClient
+from selfplay import random_policy
+
+
+async def _play_games(client, size, workload, latencies):
+    async def play(moves):
+        game = await client.new_game(size)
+        for move in moves:
+            start = time.perf_counter_ns()
+            if move is None:
+                await client.pass_move(game)
+            else:
+                await client.move(game, *move)
+            latencies.append(time.perf_counter_ns() - start)
+        await client.request('close', game=game)
+    await asyncio.gather(*(play(moves) for moves in workload))
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+async def run(games=100, connections=10, size=9, seed=0, host='127.0.0.1', port=7777, path=None):
+    """Replay games against the server; returns a dict of measurements"""
+    rng = random.Random(seed)
+    workload = [record_game(size, random_policy, rng.getrandbits(32)) for _ in range(games)]
+    clients = [await GameClient.connect(host, port, path) for _ in range(connections)]
+    latencies = []
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(_play_games(client, size, workload[i::connections], latencies)
+                               for i, client in enumerate(clients)))
+    finally:
+        elapsed = time.perf_counter() - start
+        for client in clients:
+            await client.close()
+    return {
+        'games': games,
+        'connections': connections,
+        'moves': len(latencies),
+        'seconds': elapsed,
+        'moves_per_second': len(latencies) / elapsed,
+        'p50_ms': percentile(latencies, 0.50) / 1e6,
+        'p99_ms': percentile(latencies, 0.99) / 1e6,
+        'max_ms': max(latencies) / 1e6,
+    }
+
+
+def _start_server(port):
+    """Run a server in a child process and wait until it accepts connections"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    server = subprocess.Popen([sys.executable, '-m', os.path.basename(here), 'server', '--port', str(port)],
+                              cwd=os.path.dirname(here), stderr=subprocess.DEVNULL)
+    for _ in range(100):
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.1).close()
+            return server
+        except OSError:
+            time.sleep(0.05)
+    server.kill()
+    raise RuntimeError("server did not start")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m 12345 loadgen',
+                                     description='Measure game server moves/s and move latency.')
+    parser.add_argument('--games', type=int, default=100)
+    parser.add_argument('--connections', type=int, default=10)
+    parser.add_argument('--size', type=int, default=9)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=7777)
+    parser.add_argument('--unix', help='connect to a Unix socket path instead of TCP')
+    parser.add_argument('--spawn', action='store_true', help='start a local server for the run')
+    args = parser.parse_args(argv)
+
+    server = _start_server(args.port) if args.spawn else None
+    try:
+        result = asyncio.run(run(args.games, min(args.connections, args.games), args.size, args.seed,
+                                 args.host, args.port, args.unix))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+    print(f"{result['games']} games, {result['moves']} moves over {result['connections']} connections "
+          f"in {result['seconds']:.2f}s")
+    print(f"{result['moves_per_second']:,.0f} moves/s  p50 {result['p50_ms']:.2f} ms  "
+          f"p99 {result['p99_ms']:.2f} ms  max {result['max_ms']:.2f} ms")
+    return 0
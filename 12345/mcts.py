@@ -0,0 +1,270 @@
+import math
+import random
+import time
+
+import scoring
+from game_logic import GameLogic, EMPTY, BLACK, WHITE, opponent
+from move_log import PASS
+
+# Rough number of moves a player still has to make, used to split the clock
+MIN_MOVES_LEFT = 10
+
+# Player kept by think() in a worker process so its tree survives between moves
+_player = None
+
+
+class Node:
+    """One position in the search tree.
+
+    color is the player who made move to reach this node, and wins counts
+    playouts that player won, so a parent picks the child best for itself.
+    """
+    __slots__ = ('move', 'color', 'parent', 'children', 'untried', 'visits', 'wins')
+
+    def __init__(self, move, color, parent, untried):
+        self.move = move
+        self.color = color
+        self.parent = parent
+        self.children = {}  # move -> Node
+        self.untried = untried
+        self.visits = 0
+        self.wins = 0
+
+    def select(self, exploration):
+        """Child with the best UCT value"""
+        log_visits = math.log(self.visits)
+        return max(self.children.values(),
+                   key=lambda child: child.wins / child.visits
+                   + exploration * math.sqrt(log_visits / child.visits))
+
+    def is_terminal(self):
+        return (self.move == PASS and self.parent is not None
+                and self.parent.move == PASS)
+
+
+class MCTSPlayer:
+    """Monte Carlo tree search with light random playouts.
+
+    The search runs on a private GameLogic using make() and unmake(), so
+    the game being played is never touched. Playouts pick random legal
+    moves that do not fill the player's own eyes and are scored by area.
+    The tree below the chosen move is kept and reused on the next call
+    when the game continued from it.
+
+    playouts_per_second caps the number of playouts a given time budget
+    may use, which gives the same strength on fast and slow machines;
+    None searches for the whole budget.
+    """
+
+    def __init__(self, playouts_per_second=None, komi=7.5, exploration=0.9,
+                 min_time=0.2, max_time=10.0, seed=None):
+        self.playouts_per_second = playouts_per_second
+        self.komi = komi
+        self.exploration = exploration
+        self.min_time = min_time
+        self.max_time = max_time
+        self.rng = random.Random(seed)
+        self.root = None
+        self.root_points = None
+        self.points = []
+        self.last_playouts = 0
+        self.last_rate = 0.0
+
+    def move_time(self, logic, time_left):
+        """Seconds to spend on the next move given time_left on the clock.
+
+        The remaining time is shared over an estimate of the moves still to
+        come (half the empty points) and never takes more than a fifth of
+        the clock, so the player does not lose on time.
+        """
+        empty = sum(1 for p in logic.points() if logic.board[p] == EMPTY)
+        moves_left = max(MIN_MOVES_LEFT, empty // 2)
+        budget = min(time_left / moves_left, self.max_time)
+        return max(min(budget, time_left / 5), min(self.min_time, time_left / 5))
+
+    def choose(self, logic, seconds=None, time_left=None):
+        """Best (x, y) for the player to move in logic, or None to pass.
+
+        Searches for the given number of seconds, or for a budget derived
+        from time_left when seconds is None.
+        """
+        if seconds is None:
+            seconds = self.move_time(logic, time_left if time_left is not None else 60)
+        engine = self._copy(logic)
+        self.points = engine.points()
+        root = self._reuse(logic)
+        if root is None:
+            root = Node(None, opponent(logic.to_move), None,
+                        self._candidates(engine, logic.to_move, logic))
+        else:
+            # Drop moves the real game forbids by superko
+            root.untried = [p for p in root.untried
+                            if p == PASS or not logic.repeats_position(p, logic.to_move)]
+            for p in [p for p in root.children if p != PASS and logic.repeats_position(p, logic.to_move)]:
+                del root.children[p]
+            root.parent = None
+        if not root.untried and not root.children:
+            self.root = None
+            return None
+
+        limit = None
+        if self.playouts_per_second:
+            limit = max(1, int(self.playouts_per_second * seconds))
+        start = time.perf_counter()
+        deadline = start + seconds
+        playouts = 0
+        while limit is None or playouts < limit:
+            self._iterate(engine, root)
+            playouts += 1
+            if playouts % 8 == 0 and time.perf_counter() >= deadline:
+                break
+        elapsed = time.perf_counter() - start
+        self.last_playouts = playouts
+        self.last_rate = playouts / elapsed if elapsed > 0 else 0.0
+
+        best = max(root.children.values(), key=lambda child: child.visits)
+        self.root = best
+        self.root_points = tuple(logic.log.points) + (best.move,)
+        if best.move == PASS:
+            return None
+        return logic.xy(best.move)
+
+    def win_rate(self):
+        """Share of playouts won through the move chosen last"""
+        if self.root is None or not self.root.visits:
+            return None
+        return self.root.wins / self.root.visits
+
+    # ----- search -----
+
+    def _copy(self, logic):
+        """Private engine in the same position as logic"""
+        engine = GameLogic(logic.size, superko=False)
+        for record in logic.log:
+            if record.is_stone:
+                engine.make(record.point, record.color)
+            elif record.is_pass:
+                engine.make_pass(record.color)
+        engine.to_move = logic.to_move
+        return engine
+
+    def _reuse(self, logic):
+        """The kept subtree for logic's position, if the game reached it"""
+        if self.root is None:
+            return None
+        points = tuple(logic.log.points)
+        kept = len(self.root_points)
+        node = None
+        if points[:kept] == self.root_points:
+            node = self.root
+            for point in points[kept:]:
+                node = node.children.get(point)
+                if node is None:
+                    break
+        self.root = None
+        return node
+
+    def _candidates(self, engine, color, logic=None):
+        """Moves worth searching for color; a lone PASS if there are none"""
+        board = engine.board
+        ko = engine.ko
+        moves = [p for p in self.points
+                 if board[p] == EMPTY and ko != (p, color)
+                 and not engine.fills_own_eye(p, color) and engine.is_not_suicide(p, color)
+                 and (logic is None or not logic.repeats_position(p, color))]
+        return moves or [PASS]
+
+    def _play(self, engine, move, color):
+        if move == PASS:
+            engine.make_pass(color)
+        else:
+            engine.make(move, color)
+
+    def _iterate(self, engine, root):
+        """One selection, expansion, playout and backup"""
+        node = root
+        color = opponent(root.color)
+        depth = 0
+        while not node.untried and node.children and not node.is_terminal():
+            node = node.select(self.exploration)
+            self._play(engine, node.move, color)
+            color = opponent(color)
+            depth += 1
+
+        if node.untried and not node.is_terminal():
+            index = self.rng.randrange(len(node.untried))
+            move = node.untried[index]
+            node.untried[index] = node.untried[-1]
+            node.untried.pop()
+            self._play(engine, move, color)
+            color = opponent(color)
+            depth += 1
+            child = Node(move, opponent(color), node, self._candidates(engine, color))
+            node.children[move] = child
+            node = child
+
+        # Two passes end the game, so a terminal node is scored as it stands
+        passes = 2 if node.is_terminal() else 1 if node.move == PASS else 0
+        winner = self._playout(engine, color, passes)
+        for _ in range(depth):
+            engine.unmake()
+
+        while node is not None:
+            node.visits += 1
+            if node.color == winner:
+                node.wins += 1
+            node = node.parent
+
+    def _playout(self, engine, color, passes):
+        """Play random moves to the end and return the winning color.
+
+        Every move is unmade again before returning.
+        """
+        board = engine.board
+        rng = self.rng
+        empty = [p for p in self.points if board[p] == EMPTY]
+        limit = 3 * len(self.points)
+        played = 0
+        while passes < 2 and played < limit:
+            # Try random empty points, moving the unplayable ones past n
+            n = len(empty)
+            while n:
+                index = rng.randrange(n)
+                p = empty[index]
+                if (engine.ko != (p, color) and not engine.fills_own_eye(p, color)
+                        and engine.is_not_suicide(p, color)):
+                    break
+                n -= 1
+                empty[index], empty[n] = empty[n], empty[index]
+            if n:
+                captured = engine.make(p, color)
+                empty[index] = empty[-1]
+                empty.pop()
+                for chain in captured:
+                    empty.extend(chain.stones)
+                passes = 0
+            else:
+                engine.make_pass(color)
+                passes += 1
+            played += 1
+            color = opponent(color)
+
+        score = scoring.score(engine.board, engine.width, None, self.komi, 'area')
+        for _ in range(played):
+            engine.unmake()
+        return BLACK if score.black > score.white else WHITE
+
+
+def think(size, log, time_left=None, seconds=None, komi=0.0):
+    """Worker process entry point: choose a move for the position after log.
+
+    Returns (move, playouts, playouts per second). The process keeps one MCTSPlayer, so a
+    single-process pool reuses the search tree from move to move.
+    """
+    global _player
+    if _player is None or _player.komi != komi:
+        _player = MCTSPlayer(komi=komi)
+    logic = GameLogic(size)
+    logic.replay(log)
+    move = _player.choose(logic, seconds, time_left)
+    return move, _player.last_playouts, _player.last_rate
@@ -0,0 +1,128 @@
+from array import array
+from bisect import bisect_right
+from collections import namedtuple
+
+from piece import Piece
+
+# Special values stored in place of a point index
+PASS = -1
+RESIGN = -2
+TIMEOUT = -3
+NO_MOVES = -4
+
+
+class MoveRecord(namedtuple('MoveRecord', 'color point captured clock')):
+    """One entry of a MoveLog.
+
+    point is an engine point index or one of PASS, RESIGN, TIMEOUT and
+    NO_MOVES; captured is a tuple of point indices; clock is the
+    (black, white) time left in milliseconds when the move was made.
+    """
+    __slots__ = ()
+
+    @property
+    def is_stone(self):
+        return self.point >= 0
+
+    @property
+    def is_pass(self):
+        return self.point == PASS
+
+
+class MoveLog:
+    """Compact game record backed by typed arrays.
+
+    Captured points of all moves share one array; capture_start[i] is the
+    offset of move i's captures, with one extra entry closing the last move.
+
+    Every keyframe_interval moves a copy of the board is kept, so the
+    position after any move is rebuilt from the nearest keyframe by
+    replaying at most keyframe_interval stones and their captures.
+    """
+
+    def __init__(self, keyframe_interval=16):
+        self.keyframe_interval = keyframe_interval
+        self.clear()
+
+    def clear(self, board=None):
+        """Empty the log; board is the starting position, if known"""
+        self.keyframe_moves = array('I')
+        self.keyframes = []
+        if board is not None:
+            self.keyframe_moves.append(0)
+            self.keyframes.append(bytes(board))
+        self.colors = array('b')
+        self.points = array('h')
+        self.captured = array('h')
+        self.capture_start = array('I', [0])
+        self.clocks = array('i')  # black, white milliseconds per move
+
+    def append(self, color, point, captured=(), clock=(0, 0), board=None):
+        """Add a record; board is the position after it, used for keyframes"""
+        self.colors.append(color)
+        self.points.append(point)
+        self.captured.extend(captured)
+        self.capture_start.append(len(self.captured))
+        self.clocks.extend(clock)
+        if (board is not None and self.keyframes
+                and len(self) - self.keyframe_moves[-1] >= self.keyframe_interval):
+            self.keyframe_moves.append(len(self))
+            self.keyframes.append(bytes(board))
+
+    def truncate(self, length):
+        """Drop every record from index length onwards"""
+        if length >= len(self):
+            return
+        del self.colors[length:]
+        del self.points[length:]
+        del self.captured[self.capture_start[length]:]
+        del self.capture_start[length + 1:]
+        del self.clocks[2 * length:]
+        keep = bisect_right(self.keyframe_moves, length)
+        del self.keyframe_moves[keep:]
+        del self.keyframes[keep:]
+
+    def pop(self):
+        record = self[-1]
+        self.truncate(len(self) - 1)
+        return record
+
+    def __len__(self):
+        return len(self.points)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("move index out of range")
+        start, end = self.capture_start[index], self.capture_start[index + 1]
+        return MoveRecord(self.colors[index], self.points[index],
+                          tuple(self.captured[start:end]),
+                          (self.clocks[2 * index], self.clocks[2 * index + 1]))
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def board_at(self, count):
+        """Board bytearray after the first count records have been played"""
+        count = max(0, min(count, len(self)))
+        k = bisect_right(self.keyframe_moves, count) - 1
+        board = bytearray(self.keyframes[k])
+        points = self.points
+        captured = self.captured
+        capture_start = self.capture_start
+        for index in range(self.keyframe_moves[k], count):
+            point = points[index]
+            if point >= 0:
+                board[point] = self.colors[index]
+                for i in range(capture_start[index], capture_start[index + 1]):
+                    board[captured[i]] = Piece.NoPiece
+        return board
+
+    def nbytes(self):
+        """Memory held by the record arrays and keyframes"""
+        arrays = (self.colors, self.points, self.captured, self.capture_start,
+                  self.clocks, self.keyframe_moves)
+        return (sum(a.itemsize * len(a) for a in arrays)
+                + sum(len(frame) for frame in self.keyframes))
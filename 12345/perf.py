@@ -0,0 +1,113 @@
+"""Low-overhead performance counters.
+
+Timings are only taken while enabled is True; otherwise an instrumented
+block costs a function call and an empty with statement. Durations are kept as running count,
+total, last and max in nanoseconds; gauges hold the latest value of
+something like playouts per second or bytes used.
+"""
+import json
+import time
+
+enabled = False
+
+timings = {}  # name -> Timing
+gauges = {}  # name -> latest value
+
+
+class Timing:
+    __slots__ = ('count', 'total', 'last', 'max')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.last = 0
+        self.max = 0
+
+    def add(self, ns):
+        self.count += 1
+        self.total += ns
+        self.last = ns
+        if ns > self.max:
+            self.max = ns
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0
+
+    def as_dict(self):
+        """Milliseconds, for display and trace files"""
+        return {'count': self.count, 'last_ms': self.last / 1e6,
+                'mean_ms': self.mean / 1e6, 'max_ms': self.max / 1e6}
+
+
+def enable(on=True):
+    global enabled
+    enabled = on
+
+
+def reset():
+    timings.clear()
+    gauges.clear()
+
+
+def add_time(name, ns):
+    timing = timings.get(name)
+    if timing is None:
+        timing = timings[name] = Timing()
+    timing.add(ns)
+
+
+class _Timer:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        add_time(self.name, time.perf_counter_ns() - self.start)
+        return False
+
+
+class _NotTimed:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOT_TIMED = _NotTimed()
+
+
+def timed(name):
+    """Context manager timing the body of a with block under name.
+
+    While disabled it returns one shared object that does nothing, so no
+    generator or timer is created per call.
+    """
+    if not enabled:
+        return _NOT_TIMED
+    return _Timer(name)
+
+
+def gauge(name, value):
+    if enabled:
+        gauges[name] = value
+
+
+def snapshot():
+    return {'time': time.time(),
+            'timings': {name: timing.as_dict() for name, timing in timings.items()},
+            'gauges': dict(gauges)}
+
+
+def dump(path):
+    """Append the current counters to a JSON lines trace file"""
+    with open(path, 'a') as f:
+        f.write(json.dumps(snapshot()) + '\n')
@@ -3,6 +3,7 @@ class Piece(object):
     NoPiece = 0
     White = 1
     Black = 2
+    Border = 3 # off-board padding in GameLogic's flat board
     Status = 0 #default to nopiece
     liberties = 0 #default no liberties
     x = -1
@@ -1,5 +1,9 @@
 from PyQt6.QtWidgets import QDockWidget, QVBoxLayout, QWidget, QLabel #TODO import additional Widget classes as desired
-from PyQt6.QtCore import pyqtSlot
+from PyQt6.QtCore import pyqtSlot, QTimer, Qt
+from PyQt6.QtGui import QKeySequence, QShortcut
+import os
+import time
+import perf
 
 class ScoreBoard(QDockWidget):
     '''# base the score_board on a QDockWidget'''
@@ -23,7 +27,23 @@ class ScoreBoard(QDockWidget):
         self.mainWidget.setLayout(self.mainLayout)
         self.mainLayout.addWidget(self.label_clickLocation)
         self.mainLayout.addWidget(self.label_timeRemaining)
+
+        # Performance counters, hidden until show_performance(True)
+        self.label_performance = QLabel()
+        self.label_performance.hide()
+        self.mainLayout.addWidget(self.label_performance)
+        self.performance_timer = QTimer(self)
+        self.performance_timer.timeout.connect(self.update_performance)
+        # Ctrl+Shift+P shows or hides the counters, Ctrl+Shift+D writes them
+        # to a file; GO_PERF=1 in the environment starts with them shown
+        for keys, slot in (("Ctrl+Shift+P", self.toggle_performance),
+                           ("Ctrl+Shift+D", self.dump_performance)):
+            shortcut = QShortcut(QKeySequence(keys), self)
+            shortcut.setContext(Qt.ShortcutContext.ApplicationShortcut)
+            shortcut.activated.connect(slot)
         self.setWidget(self.mainWidget)
+        if os.environ.get('GO_PERF'):
+            self.show_performance(True)
         self.show()
 
     def center(self):
@@ -40,13 +60,39 @@ class ScoreBoard(QDockWidget):
     def setClickLocation(self, clickLoc):
         '''updates the label to show the click location'''
         self.label_clickLocation.setText("Click Location:" + clickLoc)
-        print('slot ' + clickLoc)
 
     @pyqtSlot(int)
     def setTimeRemaining(self, timeRemainng):
         '''updates the time remaining label to show the time remaining'''
         update = "Time Remaining:" + str(timeRemainng)
         self.label_timeRemaining.setText(update)
-        print('slot '+update)
         # self.redraw()
 
+    def show_performance(self, on=True):
+        '''turns the performance counters on or off and shows them in the dock'''
+        perf.enable(on)
+        self.label_performance.setVisible(on)
+        if on:
+            self.performance_timer.start(500)
+            self.update_performance()
+        else:
+            self.performance_timer.stop()
+
+    def toggle_performance(self):
+        self.show_performance(not perf.enabled)
+
+    def update_performance(self):
+        '''shows the latest counters; refreshed twice a second while visible'''
+        lines = []
+        for name, timing in sorted(perf.timings.items()):
+            lines.append(f"{name}: {timing.last / 1e6:.2f} ms "
+                         f"(mean {timing.mean / 1e6:.2f}, max {timing.max / 1e6:.2f}, n={timing.count})")
+        for name, value in sorted(perf.gauges.items()):
+            lines.append(f"{name}: {value:,}")
+        self.label_performance.setText("\n".join(lines) or "No measurements yet")
+
+    def dump_performance(self, path=None):
+        '''appends the counters to a JSON lines trace file'''
+        path = path or time.strftime('go-perf-%Y%m%d-%H%M%S.jsonl')
+        perf.dump(path)
+        return path
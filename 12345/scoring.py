@@ -0,0 +1,72 @@
+from collections import namedtuple
+
+from piece import Piece
+
+EMPTY = Piece.NoPiece
+WHITE = Piece.White
+BLACK = Piece.Black
+BORDER = Piece.Border
+
+# black and white are final scores; owner is a bytearray in the board's
+# layout holding the color that owns each empty point, or EMPTY
+Score = namedtuple('Score', 'black white owner')
+
+
+def territory(board, width):
+    """Label the empty regions of a flat padded board.
+
+    Works iteratively over the array, so it has no recursion limit and
+    visits every point once. Returns (owner, counts) where counts maps each
+    color to the number of empty points bordered only by that color.
+    """
+    size = len(board)
+    owner = bytearray(size)
+    seen = bytearray(size)
+    counts = {BLACK: 0, WHITE: 0}
+    for p in range(width + 1, size - width - 1):
+        if board[p] != EMPTY or seen[p]:
+            continue
+        seen[p] = 1
+        region = [p]
+        touches = 0  # WHITE | BLACK bits of the colors bordering the region
+        for q in region:
+            for n in (q - width, q - 1, q + 1, q + width):
+                value = board[n]
+                if value == EMPTY:
+                    if not seen[n]:
+                        seen[n] = 1
+                        region.append(n)
+                elif value != BORDER:
+                    touches |= value
+        if touches == BLACK or touches == WHITE:
+            for q in region:
+                owner[q] = touches
+            counts[touches] += len(region)
+    return owner, counts
+
+
+def score(board, width, captures=None, komi=0.0, rules='territory'):
+    """Score a position.
+
+    With rules='area' each side gets its stones plus its territory; with
+    rules='territory' it gets its territory plus the stones it captured
+    (captures maps color to prisoners). komi is added to white.
+    """
+    owner, counts = territory(board, width)
+    if rules == 'area':
+        black = counts[BLACK] + board.count(BLACK)
+        white = counts[WHITE] + board.count(WHITE)
+    elif rules == 'territory':
+        captures = captures or {}
+        black = counts[BLACK] + captures.get(BLACK, 0)
+        white = counts[WHITE] + captures.get(WHITE, 0)
+    else:
+        raise ValueError(f"Unknown scoring rules: {rules}")
+    return Score(black, white + komi, owner)
+
+
+def score_many(boards, width, captures=None, komi=0.0, rules='territory'):
+    """Score a batch of same-sized boards; captures is one dict per board"""
+    if captures is None:
+        captures = [None] * len(boards)
+    return [score(board, width, caps, komi, rules) for board, caps in zip(boards, captures)]
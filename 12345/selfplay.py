@@ -0,0 +1,169 @@
+"""Headless self-play: python -m 12345 selfplay --games N --workers K"""
+import argparse
+import json
+import multiprocessing
+import random
+import sys
+import time
+
+import sgf
+from game_logic import GameLogic, BLACK, WHITE
+from mcts import MCTSPlayer
+
+# Playouts per move for the 'mcts' policy
+MCTS_PLAYOUTS = 300
+
+
+def candidate_moves(logic):
+    """Legal points for the player to move that do not fill an own eye"""
+    color = logic.to_move
+    return [(x, y) for x, y in logic.legal_moves(color)
+            if not logic.fills_own_eye(logic.point(x, y), color)]
+
+
+# A policy takes (logic, rng) and returns the (x, y) to play, or None to pass
+
+def random_policy(logic, rng):
+    moves = candidate_moves(logic)
+    return rng.choice(moves) if moves else None
+
+
+def capture_policy(logic, rng):
+    """Take the biggest capture on offer, otherwise play randomly"""
+    moves = candidate_moves(logic)
+    if not moves:
+        return None
+    rng.shuffle(moves)
+    return max(moves, key=lambda move: len(logic.probe(*move).captured))
+
+
+def mcts_policy(logic, rng):
+    """A short, fixed-size tree search; no subtree is kept between moves"""
+    player = MCTSPlayer(playouts_per_second=MCTS_PLAYOUTS, seed=rng.random())
+    return player.choose(logic, seconds=1.0)
+
+
+POLICIES = {
+    'random': random_policy,
+    'capture': capture_policy,
+    'mcts': mcts_policy,
+}
+
+
+def result_string(margin):
+    """SGF style result from black's margin, e.g. 'B+3.5' or '0' for a draw"""
+    if margin > 0:
+        return f"B+{margin:g}"
+    if margin < 0:
+        return f"W+{-margin:g}"
+    return "0"
+
+
+def play_game(size=9, black='random', white='random', seed=None, komi=7.5,
+              rules='area', max_moves=None):
+    """Play one game between two named policies and return it as a dict"""
+    rng = random.Random(seed)
+    policies = {BLACK: POLICIES[black], WHITE: POLICIES[white]}
+    if max_moves is None:
+        max_moves = 3 * size * size
+    logic = GameLogic(size)
+    moves = []
+    while len(moves) < max_moves and logic.passes_in_a_row() < 2:
+        move = policies[logic.to_move](logic, rng)
+        if move is None:
+            moves.append(None)
+            logic.pass_move()
+        else:
+            moves.append(list(move))
+            logic.play(*move)
+    score = logic.score(rules, komi)
+    margin = score.black - score.white
+    return {
+        'size': size,
+        'komi': komi,
+        'rules': rules,
+        'black': black,
+        'white': white,
+        'seed': seed,
+        'moves': moves,
+        'score': margin,
+        'result': result_string(margin),
+    }
+
+
+def game_moves(game):
+    """(color, x, y) tuples of a game dict, black moving first"""
+    colors = (BLACK, WHITE)
+    for index, move in enumerate(game['moves']):
+        x, y = move if move is not None else (None, None)
+        yield colors[index % 2], x, y
+
+
+def game_to_sgf(game):
+    return sgf.write_game(game['size'], game_moves(game), game['result'], game['komi'],
+                          black=game['black'], white=game['white'])
+
+
+def _play_task(task):
+    index, options = task
+    game = play_game(**options)
+    game['game'] = index
+    return game
+
+
+def run(games, workers=None, seed=0, output=None, sgf_file=None, report=None, **options):
+    """Play games on a process pool, writing each one as it finishes.
+
+    output receives one JSON line per game and sgf_file the same games as
+    an SGF collection. Returns (games played, seconds taken).
+    """
+    tasks = [(index, dict(options, seed=seed + index)) for index in range(games)]
+    start = time.perf_counter()
+    played = plies = 0
+    with multiprocessing.Pool(workers) as pool:
+        for game in pool.imap_unordered(_play_task, tasks):
+            played += 1
+            plies += len(game['moves'])
+            if output is not None:
+                output.write(json.dumps(game) + '\n')
+            if sgf_file is not None:
+                sgf_file.write(game_to_sgf(game))
+            if report is not None and (played % 100 == 0 or played == games):
+                elapsed = time.perf_counter() - start
+                report.write(f"{played}/{games} games, {played / elapsed:.1f} games/s, "
+                             f"{plies / elapsed:.0f} moves/s\n")
+    return played, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m 12345 selfplay',
+                                     description='Play games between policies without a display.')
+    parser.add_argument('--games', type=int, default=100)
+    parser.add_argument('--workers', type=int, default=None,
+                        help='worker processes (default: one per CPU)')
+    parser.add_argument('--size', type=int, default=9)
+    parser.add_argument('--komi', type=float, default=7.5)
+    parser.add_argument('--rules', choices=('area', 'territory'), default='area')
+    parser.add_argument('--black', choices=sorted(POLICIES), default='random')
+    parser.add_argument('--white', choices=sorted(POLICIES), default='random')
+    parser.add_argument('--max-moves', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', default='-', help="JSONL file for finished games ('-' for stdout)")
+    parser.add_argument('--sgf', default=None, help='also write the games to this SGF file')
+    args = parser.parse_args(argv)
+
+    output = sys.stdout if args.out == '-' else open(args.out, 'w')
+    sgf_file = open(args.sgf, 'w') if args.sgf else None
+    try:
+        played, elapsed = run(args.games, args.workers, args.seed, output, sgf_file,
+                              report=sys.stderr, size=args.size, komi=args.komi,
+                              rules=args.rules, black=args.black, white=args.white,
+                              max_moves=args.max_moves)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        if sgf_file is not None:
+            sgf_file.close()
+    print(f"{played} games, {args.black} (black) vs {args.white} (white), in {elapsed:.2f}s, "
+          f"{played / elapsed:.1f} games/s", file=sys.stderr)
+    return 0
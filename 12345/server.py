@@ -0,0 +1,297 @@
+"""Headless asyncio server hosting many games on the rules engine.
+
+python -m 12345 server --port 7777
+
+The protocol is one JSON object per line in each direction. Every
+request has an "op" and may carry an "id", which is copied into its
+reply so clients can pipeline requests:
+
+  {"id": 1, "op": "new", "size": 9, "komi": 7.5, "control": {"main": 600}}
+  {"id": 2, "op": "move", "game": 1, "x": 2, "y": 3}
+  {"id": 3, "op": "pass", "game": 1}
+  {"id": 4, "op": "resign", "game": 1}
+  {"id": 5, "op": "state", "game": 1}
+  {"id": 6, "op": "watch", "game": 1}
+  {"id": 7, "op": "unwatch", "game": 1}
+  {"id": 8, "op": "close", "game": 1}
+
+Replies have "ok" and either the result or an "error" message. The
+"state" reply and the watch snapshot give the board as a string of
+size * size characters, row by row from y = 0: '.' for an empty point,
+'B' for a black stone and 'W' for a white one. The
+server owns the clocks: time is charged when a move arrives, so clients
+cannot stop their own clock.
+
+A watching connection also receives messages with a "type" and no "id":
+a "snapshot" of the board when it starts watching, then a "delta" for
+every move (see broadcast.py), a "result" if a player runs out of time,
+and "dropped" if it fell too far behind and has to watch again.
+"""
+import argparse
+import asyncio
+import json
+import sys
+
+import broadcast
+import clock
+from game_logic import GameLogic, IllegalMoveError, COLOR_NAMES, BLACK, WHITE, opponent
+
+# Board characters indexed by Piece value (empty, white, black, border)
+BOARD_CHARS = '.WB#'
+
+# Longest request line accepted; the connection is dropped beyond it
+MAX_LINE = 64 * 1024
+
+
+class ProtocolError(Exception):
+    """A request the server cannot act on; sent back as the error message"""
+
+
+class ServerGame:
+    """One hosted game with its lock and server-side clock"""
+
+    def __init__(self, game_id, size, komi, control):
+        self.id = game_id
+        self.logic = GameLogic(size)
+        self.komi = komi
+        self.clock = clock.GameClock(control)
+        self.clock.start(BLACK)
+        self.lock = asyncio.Lock()
+        self.result = None
+
+    def state(self):
+        logic = self.logic
+        return {
+            'game': self.id,
+            'size': logic.size,
+            'to_move': COLOR_NAMES[logic.to_move],
+            'ply': len(logic.log),
+            'hash': logic.hash,
+            'board': ''.join(BOARD_CHARS[logic.board[p]] for p in logic.points()),
+            'captures': {COLOR_NAMES[c]: logic.captures[c] for c in (BLACK, WHITE)},
+            'clock': self.clock.snapshot(),
+            'result': self.result,
+        }
+
+    def _check_running(self):
+        if self.result is not None:
+            raise ProtocolError(f"game {self.id} is over: {self.result}")
+        flagged = self.clock.flagged()
+        if flagged is not None:
+            self.clock.stop()
+            self.result = COLOR_NAMES[opponent(flagged)][0].upper() + '+T'
+            raise ProtocolError(f"{COLOR_NAMES[flagged]} ran out of time")
+
+    def play(self, x, y):
+        self._check_running()
+        try:
+            captured = self.logic.play(x, y, self.clock.snapshot())
+        except IllegalMoveError as e:
+            raise ProtocolError(str(e))
+        self.clock.press()
+        return {'captured': captured}
+
+    def pass_move(self):
+        self._check_running()
+        self.logic.pass_move(self.clock.snapshot())
+        self.clock.press()
+        if self.logic.passes_in_a_row() >= 2:
+            self.clock.stop()
+            score = self.logic.score('area', self.komi)
+            margin = score.black - score.white
+            self.result = f"B+{margin:g}" if margin > 0 else f"W+{-margin:g}" if margin < 0 else "0"
+        return {}
+
+    def resign(self):
+        self._check_running()
+        color = self.logic.to_move
+        self.logic.resign(self.clock.snapshot())
+        self.clock.stop()
+        self.result = COLOR_NAMES[opponent(color)][0].upper() + '+R'
+        return {}
+
+
+class Watcher:
+    """Writes the broadcasts one connection subscribed to"""
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.subscriptions = {}  # game id -> Subscription
+        self.tasks = set()
+
+    def add(self, subscription):
+        self.subscriptions[subscription.key] = subscription
+        task = asyncio.get_running_loop().create_task(self._forward(subscription))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def _forward(self, subscription):
+        try:
+            async for data in subscription:
+                self.writer.write(data)
+                await self.writer.drain()
+            if subscription.dropped:
+                self.writer.write(broadcast.encode({'type': 'dropped', 'game': subscription.key}))
+        except ConnectionError:
+            pass
+        if self.subscriptions.get(subscription.key) is subscription:
+            del self.subscriptions[subscription.key]
+
+    def close(self, broadcaster):
+        for subscription in list(self.subscriptions.values()):
+            broadcaster.unsubscribe(subscription)
+        for task in self.tasks:
+            task.cancel()
+
+
+class GameServer:
+    """Hosts games and serves the JSON lines protocol.
+
+    Each connection handles its requests in order and waits for its
+    replies to drain before reading more, so a slow client only slows
+    itself down. Game commands run under the game's lock. Watchers are
+    fed from bounded broadcast queues, so they cannot slow the players.
+    """
+
+    def __init__(self, max_games=100_000, watch_queue=256):
+        self.max_games = max_games
+        self.broadcast = broadcast.Broadcaster(watch_queue)
+        self.games = {}
+        self.next_id = 1
+        self.moves = 0
+
+    async def handle(self, reader, writer):
+        watcher = Watcher(writer)
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, asyncio.LimitOverrunError):
+                    break  # line longer than MAX_LINE
+                if not line:
+                    break
+                reply = await self.respond(line, watcher)
+                writer.write(json.dumps(reply).encode() + b'\n')
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            watcher.close(self.broadcast)
+            writer.close()
+
+    async def respond(self, line, watcher=None):
+        request_id = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ProtocolError("request must be a JSON object")
+            request_id = request.get('id')
+            reply = await self.dispatch(request, watcher)
+            reply['ok'] = True
+        except ProtocolError as e:
+            reply = {'ok': False, 'error': str(e)}
+        except (ValueError, TypeError, KeyError) as e:
+            reply = {'ok': False, 'error': f"bad request: {e}"}
+        if request_id is not None:
+            reply['id'] = request_id
+        return reply
+
+    async def dispatch(self, request, watcher=None):
+        op = request.get('op')
+        if op == 'new':
+            return self.new_game(request)
+        if op == 'list':
+            return {'games': [game.id for game in self.games.values() if game.result is None]}
+        game = self.games.get(request.get('game'))
+        if game is None:
+            raise ProtocolError(f"no game {request.get('game')!r}")
+        if op in ('watch', 'unwatch'):
+            return self.watch(game, watcher, op == 'watch')
+        async with game.lock:
+            ply, result = len(game.logic.log), game.result
+            try:
+                if op == 'move':
+                    reply = game.play(int(request['x']), int(request['y']))
+                    self.moves += 1
+                elif op == 'pass':
+                    reply = game.pass_move()
+                    self.moves += 1
+                elif op == 'resign':
+                    reply = game.resign()
+                elif op == 'state':
+                    return game.state()
+                elif op == 'close':
+                    del self.games[game.id]
+                    self.broadcast.close(game.id)
+                    return {}
+                else:
+                    raise ProtocolError(f"unknown op {op!r}")
+            finally:
+                self.publish(game, ply, result)
+        reply.update(to_move=COLOR_NAMES[game.logic.to_move], clock=game.clock.snapshot(),
+                     result=game.result)
+        return reply
+
+    def publish(self, game, ply, result):
+        """Tell the game's watchers what changed since ply and result"""
+        if not self.broadcast.watchers(game.id):
+            return
+        if len(game.logic.log) != ply:
+            self.broadcast.publish(game.id, broadcast.delta(game.id, game.logic, game.clock.snapshot(),
+                                                            game.result))
+        elif game.result != result:
+            self.broadcast.publish(game.id, {'type': 'result', 'game': game.id, 'result': game.result})
+
+    def watch(self, game, watcher, on):
+        if watcher is None:
+            raise ProtocolError("watching needs a connection")
+        subscription = watcher.subscriptions.get(game.id)
+        if on and subscription is None:
+            watcher.add(self.broadcast.subscribe(game.id, dict(game.state(), type='snapshot')))
+        elif not on and subscription is not None:
+            self.broadcast.unsubscribe(subscription)
+        return {}
+
+    def new_game(self, request):
+        if len(self.games) >= self.max_games:
+            raise ProtocolError("server is full")
+        control = request.get('control')
+        if control is None:
+            control = {}
+        elif not isinstance(control, dict):
+            raise ProtocolError("control must be a JSON object")
+        control = clock.TimeControl(float(control.get('main', 1800)), float(control.get('increment', 0)),
+                                    float(control.get('byoyomi', 0)), int(control.get('periods', 0)))
+        game = ServerGame(self.next_id, int(request.get('size', 9)), float(request.get('komi', 7.5)),
+                          control)
+        self.games[game.id] = game
+        self.next_id += 1
+        return {'game': game.id}
+
+    async def serve(self, host='127.0.0.1', port=7777, path=None):
+        if path:
+            server = await asyncio.start_unix_server(self.handle, path, limit=MAX_LINE)
+        else:
+            server = await asyncio.start_server(self.handle, host, port, limit=MAX_LINE)
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m 12345 server',
+                                     description='Host games over a JSON lines socket protocol.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=7777)
+    parser.add_argument('--unix', help='listen on this Unix socket path instead of TCP')
+    parser.add_argument('--max-games', type=int, default=100_000)
+    parser.add_argument('--watch-queue', type=int, default=256,
+                        help='messages queued per watcher before it is dropped')
+    args = parser.parse_args(argv)
+
+    where = args.unix or f"{args.host}:{args.port}"
+    print(f"Serving games on {where}", file=sys.stderr)
+    try:
+        asyncio.run(GameServer(args.max_games, args.watch_queue).serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+    return 0
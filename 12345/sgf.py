@@ -0,0 +1,246 @@
+"""SGF (Smart Game Format) reading and writing.
+
+The reader streams: game_texts() cuts one game tree at a time out of an
+open file, read in chunks, and read_games() parses each game only when
+it is asked for. Archives of any size, or whole directory trees of .sgf
+files, are processed without holding more than one game in memory.
+Only the main line of a game is kept; variations are skipped.
+"""
+import os
+import re
+from collections import namedtuple
+
+from game_logic import GameLogic, BLACK, WHITE, MIN_BOARD_SIZE, MAX_BOARD_SIZE
+from move_log import RESIGN, TIMEOUT
+
+# SGF writes points as two letters, column then row, starting at 'a'
+SGF_LETTERS = 'abcdefghijklmnopqrstuvwxy'
+SGF_COLORS = {BLACK: 'B', WHITE: 'W'}
+COLORS_BY_NAME = {'B': BLACK, 'W': WHITE}
+
+# moves and setup are lists of (color, x, y); x and y are None for a pass
+SgfGame = namedtuple('SgfGame', 'size komi result black white moves setup')
+
+# Characters that change the parser state while splitting a stream
+_SPECIAL = re.compile(r'[()\[\]\\]')
+_TOKEN = re.compile(r'\(|\)|;|([A-Za-z]+)\s*((?:\[(?:\\.|[^\\\]])*\]\s*)+)', re.S)
+_VALUE = re.compile(r'\[((?:\\.|[^\\\]])*)\]', re.S)
+_ESCAPE = re.compile(r'\\(.)', re.S)
+
+
+def sgf_point(x, y):
+    return SGF_LETTERS[x] + SGF_LETTERS[y]
+
+
+def sgf_escape(text):
+    return str(text).replace('\\', '\\\\').replace(']', '\\]')
+
+
+# ----- writing -----
+
+def write_game(size, moves, result=None, komi=0.0, black='', white='', setup=()):
+    """SGF text for one game.
+
+    moves is a sequence of (color, x, y) with x and y set to None for a
+    pass; result is an SGF result string such as 'B+3.5'.
+    """
+    header = ['FF[4]', 'GM[1]', 'CA[UTF-8]', 'SZ[%d]' % size, 'KM[%s]' % komi]
+    if black:
+        header.append('PB[%s]' % sgf_escape(black))
+    if white:
+        header.append('PW[%s]' % sgf_escape(white))
+    if result:
+        header.append('RE[%s]' % sgf_escape(result))
+    for color in (BLACK, WHITE):
+        stones = [sgf_point(x, y) for c, x, y in setup if c == color]
+        if stones:
+            header.append('A%s[%s]' % (SGF_COLORS[color], ']['.join(stones)))
+    nodes = [';' + ''.join(header)]
+    for color, x, y in moves:
+        where = '' if x is None else sgf_point(x, y)
+        nodes.append(';%s[%s]' % (SGF_COLORS[color], where))
+    return '(' + '\n'.join(nodes) + ')\n'
+
+
+def game_text(game):
+    """SGF text for an SgfGame"""
+    return write_game(game.size, game.moves, game.result, game.komi,
+                      game.black, game.white, game.setup)
+
+
+def write_games(target, games):
+    """Write games one by one to a path or an open text file.
+
+    games may be any iterable, such as a generator of self-play games or
+    read_games() output, and is consumed lazily. Returns the number written.
+    """
+    if not hasattr(target, 'write'):
+        with open(target, 'w', encoding='utf-8') as stream:
+            return write_games(stream, games)
+    count = 0
+    for game in games:
+        target.write(game_text(game))
+        count += 1
+    return count
+
+
+def from_logic(logic, black='', white='', komi=0.0, result=None):
+    """SgfGame for the game recorded in a GameLogic's move log"""
+    moves = []
+    for record in logic.log:
+        if record.is_stone:
+            moves.append((record.color, *logic.xy(record.point)))
+        elif record.is_pass:
+            moves.append((record.color, None, None))
+        elif record.point in (RESIGN, TIMEOUT) and result is None:
+            winner = SGF_COLORS[BLACK + WHITE - record.color]
+            result = winner + ('+R' if record.point == RESIGN else '+T')
+    return SgfGame(logic.size, komi, result, black, white, moves, [])
+
+
+def to_logic(game):
+    """GameLogic with the game played through; setup stones become moves"""
+    logic = GameLogic(game.size)
+    for color, x, y in list(game.setup) + list(game.moves):
+        logic.to_move = color
+        if x is None:
+            logic.pass_move()
+        else:
+            logic.play(x, y)
+    return logic
+
+
+# ----- reading -----
+
+def game_texts(stream, chunk_size=1 << 16):
+    """Yield the text of each top level game tree in an SGF stream.
+
+    The stream is read chunk_size characters at a time and only the game
+    being cut out is buffered. Text between games is ignored.
+    """
+    buffer = ''
+    depth = 0
+    in_value = False
+    skip = -1  # index of a character escaped by a backslash
+    start = 0
+    for chunk in iter(lambda: stream.read(chunk_size), ''):
+        scan = len(buffer)
+        buffer += chunk
+        for match in _SPECIAL.finditer(buffer, scan):
+            i = match.start()
+            if i == skip:
+                continue
+            char = buffer[i]
+            if in_value:
+                if char == '\\':
+                    skip = i + 1
+                elif char == ']':
+                    in_value = False
+            elif depth == 0:
+                if char == '(':
+                    start = i
+                    depth = 1
+            elif char == '[':
+                in_value = True
+            elif char == '(':
+                depth += 1
+            elif char == ')':
+                depth -= 1
+                if depth == 0:
+                    yield buffer[start:i + 1]
+        # Keep only the unfinished game
+        keep = start if depth else len(buffer)
+        buffer = buffer[keep:]
+        skip -= keep
+        start -= keep
+
+
+def parse_point(value, size):
+    """(x, y) of an SGF point, or (None, None) for a pass"""
+    if not value or (value == 'tt' and size <= 19):
+        return None, None
+    if len(value) != 2 or value[0] not in SGF_LETTERS or value[1] not in SGF_LETTERS:
+        raise ValueError(f"Bad SGF point {value!r}")
+    return SGF_LETTERS.index(value[0]), SGF_LETTERS.index(value[1])
+
+
+def parse_points(value, size):
+    """Points of a setup value, which may be a rectangle such as 'aa:cc'"""
+    if ':' not in value:
+        return [parse_point(value, size)]
+    (x1, y1), (x2, y2) = (parse_point(corner, size) for corner in value.split(':', 1))
+    if x1 is None or x2 is None:
+        raise ValueError(f"Bad SGF point list {value!r}")
+    return [(x, y) for y in range(min(y1, y2), max(y1, y2) + 1)
+            for x in range(min(x1, x2), max(x1, x2) + 1)]
+
+
+def parse_game(text):
+    """SgfGame for the main line of one game tree"""
+    properties = {}
+    moves = []
+    setup = []
+    depth = 0
+    nodes = 0
+    for match in _TOKEN.finditer(text):
+        token = match.group(0)
+        if token == '(':
+            depth += 1
+        elif token == ')':
+            depth -= 1
+            # The first variation has ended, the rest are alternatives
+            if depth >= 1:
+                break
+        elif token == ';':
+            nodes += 1
+        else:
+            name = match.group(1)
+            values = [_ESCAPE.sub(r'\1', value) for value in _VALUE.findall(match.group(2))]
+            if nodes == 1 and name not in ('B', 'W'):
+                properties[name] = values
+            if name in ('B', 'W', 'AB', 'AW'):
+                color = COLORS_BY_NAME[name[-1]]
+                size = int(properties.get('SZ', ['19'])[0].split(':')[0])
+                for value in values:
+                    if len(name) == 1:
+                        moves.append((color, *parse_point(value.strip(), size)))
+                    else:
+                        setup.extend((color, x, y) for x, y in parse_points(value.strip(), size))
+
+    def first(name, default=''):
+        return properties.get(name, [default])[0]
+
+    size = int(first('SZ', '19').split(':')[0])
+    if not MIN_BOARD_SIZE <= size <= MAX_BOARD_SIZE:
+        raise ValueError(f"Unsupported board size {size}")
+    try:
+        komi = float(first('KM', '0'))
+    except ValueError:
+        komi = 0.0
+    return SgfGame(size, komi, first('RE') or None, first('PB'), first('PW'), moves, setup)
+
+
+def read_texts(source):
+    """Yield the text of every game in source without parsing it.
+
+    source is an open text file, a .sgf file (which may hold many games)
+    or a directory, searched recursively in name order. A caller that
+    parses each text itself can skip a damaged game and carry on.
+    """
+    if hasattr(source, 'read'):
+        yield from game_texts(source)
+    elif os.path.isdir(source):
+        for root, dirs, files in os.walk(source):
+            dirs.sort()
+            for name in sorted(files):
+                if name.lower().endswith('.sgf'):
+                    yield from read_texts(os.path.join(root, name))
+    else:
+        with open(source, encoding='utf-8', errors='replace') as stream:
+            yield from game_texts(stream)
+
+
+def read_games(source):
+    """Yield an SgfGame for every game in source (see read_texts), parsing each on demand"""
+    for text in read_texts(source):
+        yield parse_game(text)
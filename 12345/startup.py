@@ -0,0 +1,133 @@
+"""Startup measurements: import time budgets and time to first paint.
+
+python -m 12345 startup
+python -m 12345 startup --first-paint
+
+Each entry module is imported in a fresh interpreter under -X importtime
+and its cumulative import time compared with a budget. Command line
+entry points must not import PyQt6 at all. With --first-paint the app
+is also started offscreen and asked to report how long it took from
+launch until its first paint event. The exit status is 1 when anything
+is over budget or fails to import.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+# module -> (budget in ms, whether it may import PyQt6)
+IMPORT_BUDGETS = {
+    'game_logic': (25, False),
+    'sgf': (40, False),
+    'selfplay': (60, False),
+    'bench': (70, False),
+    'game_db': (60, False),
+    'server': (150, False),
+    # Imported lazily by the board, so only checked here
+    'mcts': (30, False),
+    'client': (150, False),
+    'board_canvas': (250, True),
+    'board': (300, True),
+    'go': (350, True),
+}
+
+FIRST_PAINT_BUDGET = 1500  # ms
+
+# Set in the app's environment to print the first paint time and quit
+REPORT_VARIABLE = 'GO_STARTUP_REPORT'
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def import_time(module, repeat=3):
+    """(best cumulative import time in ms, whether PyQt6 was imported)"""
+    code = f"import {module}, sys; print('PyQt6' in sys.modules)"
+    best = None
+    for _ in range(repeat):
+        run = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=HERE,
+                             capture_output=True, text=True)
+        if run.returncode:
+            lines = run.stderr.strip().splitlines()
+            raise ImportError(lines[-1] if lines else f"exited with status {run.returncode}")
+        for line in run.stderr.splitlines():
+            parts = line.split('|')
+            if len(parts) == 3 and parts[2].rstrip() == f' {module}':
+                ms = int(parts[1]) / 1000
+                best = ms if best is None else min(best, ms)
+        qt = run.stdout.strip() == 'True'
+    return best, qt
+
+
+def watch_first_paint(app, started):
+    """Record the time from started (perf_counter_ns) to the first paint event"""
+    from PyQt6.QtCore import QObject, QEvent
+    import perf
+    import tracing
+
+    class FirstPaint(QObject):
+        def eventFilter(self, watched, event):
+            if event.type() == QEvent.Type.Paint:
+                app.removeEventFilter(self)
+                ms = (time.perf_counter_ns() - started) / 1e6
+                # Kept even with the counters off, it only happens once
+                perf.gauges['first_paint_ms'] = round(ms, 1)
+                tracing.info('first_paint', ms=ms)
+                if os.environ.get(REPORT_VARIABLE):
+                    print(f"first_paint_ms {ms:.1f}", file=sys.stderr)
+                    app.quit()
+            return False
+
+    app.first_paint_filter = FirstPaint(app)
+    app.installEventFilter(app.first_paint_filter)
+
+
+def first_paint(timeout=60):
+    """Milliseconds from launching the app offscreen to its first paint"""
+    env = dict(os.environ, QT_QPA_PLATFORM='offscreen', **{REPORT_VARIABLE: '1'})
+    run = subprocess.run([sys.executable, '-m', os.path.basename(HERE)], cwd=os.path.dirname(HERE),
+                         env=env, capture_output=True, text=True, timeout=timeout)
+    for line in run.stderr.splitlines():
+        if line.startswith('first_paint_ms '):
+            return float(line.split()[1])
+    lines = run.stderr.strip().splitlines()
+    raise RuntimeError(lines[-1] if lines else f"app exited with status {run.returncode}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m 12345 startup',
+                                     description='Check import time budgets and time to first paint.')
+    parser.add_argument('modules', nargs='*', help=f"modules to check (default all): {', '.join(IMPORT_BUDGETS)}")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--first-paint', action='store_true', help='also launch the app and time its first paint')
+    args = parser.parse_args(argv)
+
+    failed = False
+    for module in args.modules or IMPORT_BUDGETS:
+        budget, qt_allowed = IMPORT_BUDGETS.get(module, (None, True))
+        try:
+            ms, qt = import_time(module, args.repeat)
+        except ImportError as e:
+            # A module that cannot be imported fails the check, so a broken
+            # lazy import cannot pass unnoticed
+            print(f"{module:14} failed ({e})")
+            failed = True
+            continue
+        problems = []
+        if budget is not None and ms > budget:
+            problems.append(f"over {budget} ms budget")
+        if qt and not qt_allowed:
+            problems.append("imports PyQt6")
+        failed = failed or bool(problems)
+        print(f"{module:14} {ms:8.1f} ms  {'PyQt6' if qt else 'no Qt':6}  {', '.join(problems) or 'ok'}")
+
+    if args.first_paint:
+        try:
+            ms = first_paint()
+        except (RuntimeError, subprocess.TimeoutExpired) as e:
+            print(f"{'first paint':14} failed ({e})")
+            return 1
+        over = ms > FIRST_PAINT_BUDGET
+        failed = failed or over
+        print(f"{'first paint':14} {ms:8.1f} ms  {'':6}  {f'over {FIRST_PAINT_BUDGET} ms budget' if over else 'ok'}")
+    return 1 if failed else 0
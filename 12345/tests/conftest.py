@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The modules import each other by plain name, as under 'python -m 12345'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,114 @@
+import random
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from batch_engine import BatchBoards, PASS
+from game_logic import GameLogic, BLACK, WHITE
+
+
+def _stones(batch):
+    values = batch.boards.ravel()
+    return (values == BLACK) | (values == WHITE)
+
+
+def _played(size, moves):
+    """One board with moves ((x, y) or None) played through step()"""
+    batch = BatchBoards(1, size)
+    for move in moves:
+        assert batch.step([PASS if move is None else move[1] * size + move[0]])[0]
+    return batch
+
+
+def _logic_legal(logic):
+    return [logic.check_move(x, y) is None for y in range(logic.size) for x in range(logic.size)]
+
+
+@pytest.mark.parametrize('size', [3, 5, 7, 9])
+def test_batch_matches_game_logic_on_random_games(size):
+    count = 6
+    rng = np.random.default_rng(size)
+    pick = random.Random(size)
+    batch = BatchBoards(count, size, komi=0.5)
+    games = [GameLogic(size, superko=False) for _ in range(count)]
+    for _ in range(3 * size * size):
+        legal = batch.legal_mask()
+        moves = batch.random_moves(rng)
+        for k, logic in enumerate(games):
+            if not batch.finished[k]:
+                assert list(legal[k]) == _logic_legal(logic)
+            # Now and then try any point, legal or not
+            if pick.random() < 0.2:
+                moves[k] = pick.randrange(size * size)
+        finished = batch.finished.copy()
+        accepted = batch.step(moves)
+        for k, logic in enumerate(games):
+            if finished[k]:
+                continue
+            if moves[k] == PASS:
+                logic.pass_move()
+                assert accepted[k]
+            else:
+                x, y = moves[k] % size, moves[k] // size
+                assert accepted[k] == (logic.check_move(x, y) is None)
+                if accepted[k]:
+                    logic.play(x, y)
+            assert batch.boards[k].tobytes() == bytes(logic.board)
+            assert batch.to_move[k] == logic.to_move
+            assert (batch.captures[k, BLACK], batch.captures[k, WHITE]) == (
+                logic.captures[BLACK], logic.captures[WHITE])
+        # The incrementally kept labels agree with a fresh labeling
+        assert np.array_equal(batch.labels, batch._label(_stones(batch)))
+        if batch.finished.all():
+            break
+    for k, logic in enumerate(games):
+        result = logic.score('area', komi=0.5)
+        assert batch.score()[k] == result.black - result.white
+
+
+def test_an_occupied_point_is_rejected():
+    batch = _played(5, [(2, 2)])
+    before = batch.boards.copy()
+    assert not batch.step([2 * 5 + 2])[0]
+    assert np.array_equal(batch.boards, before)
+    assert batch.to_move[0] == WHITE
+    assert not batch.legal_mask()[0, 2 * 5 + 2]
+
+
+def test_suicide_is_rejected_and_the_chains_stay_apart():
+    # White at (1, 0) would join (0, 0) and (2, 0) with no liberty left
+    batch = _played(5, [(1, 1), (0, 0), (0, 1), (2, 0), (2, 1), (4, 4), (3, 0)])
+    assert not batch.legal_mask()[0, 1]
+    before = batch.boards.copy()
+    assert not batch.step([1])[0]
+    assert np.array_equal(batch.boards, before)
+    assert batch.to_move[0] == WHITE
+    width = batch.width
+    assert batch.labels[width + 1] != batch.labels[width + 3]
+    assert np.array_equal(batch.labels, batch._label(_stones(batch)))
+
+
+def test_ko_blocks_the_immediate_retake():
+    setup = [(1, 0), (2, 0), (0, 1), (3, 1), (1, 2), (2, 2), (4, 4), (1, 1)]
+    batch = _played(5, setup + [(2, 1)])
+    assert batch.captures[0, BLACK] == 1
+    retake = 1 * 5 + 1
+    assert not batch.legal_mask()[0, retake]
+    assert not batch.step([retake])[0]
+    # Once both sides have played elsewhere the ko is lifted
+    assert batch.step([4 * 5 + 0])[0] and batch.step([3 * 5 + 4])[0]
+    assert batch.legal_mask()[0, retake]
+    assert batch.step([retake])[0]
+    assert batch.captures[0, WHITE] == 1
+
+
+def test_two_passes_finish_a_board_and_later_moves_are_ignored():
+    batch = BatchBoards(2, 5)
+    batch.step([PASS, 12])
+    batch.step([PASS, PASS])
+    assert list(batch.finished) == [True, False]
+    before = batch.boards[0].copy()
+    assert batch.step([12, PASS])[0]
+    assert np.array_equal(batch.boards[0], before)
+    assert list(batch.score()) == [0, 25]
@@ -0,0 +1,104 @@
+import asyncio
+import json
+
+from broadcast import Broadcaster, END
+from client import GameClient
+from game_logic import GameLogic
+from server import GameServer
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+async def _drain(subscription):
+    return [json.loads(data) async for data in subscription]
+
+
+def test_publish_reaches_every_subscriber_once():
+    async def scenario():
+        broadcaster = Broadcaster(maxsize=4)
+        first = broadcaster.subscribe(1, {'n': 0})
+        second = broadcaster.subscribe(1)
+        other = broadcaster.subscribe(2)
+        assert broadcaster.publish(1, {'n': 1}) == 2
+        assert broadcaster.publish(3, {'n': 1}) == 0
+        broadcaster.close(1)
+        broadcaster.close(2)
+        return await _drain(first), await _drain(second), await _drain(other), broadcaster
+    first, second, other, broadcaster = run(scenario())
+    assert first == [{'n': 0}, {'n': 1}]
+    assert second == [{'n': 1}]
+    assert other == []
+    assert broadcaster.published == 1 and broadcaster.subscribers == {}
+
+
+def test_a_lagging_subscriber_is_dropped_after_its_queue():
+    async def scenario():
+        broadcaster = Broadcaster(maxsize=2)
+        slow = broadcaster.subscribe(1)
+        fast = broadcaster.subscribe(1, maxsize=10)
+        delivered = [broadcaster.publish(1, {'n': n}) for n in range(3)]
+        fast_seen = [json.loads(fast.queue.get_nowait()) for _ in range(3)]
+        return delivered, slow, await _drain(slow), fast_seen, broadcaster
+    delivered, slow, slow_seen, fast_seen, broadcaster = run(scenario())
+    assert delivered == [2, 2, 1]
+    # Whatever was queued before the drop still arrives, then END
+    assert slow_seen == [{'n': 0}, {'n': 1}]
+    assert slow.dropped and broadcaster.dropped == 1
+    assert fast_seen == [{'n': 0}, {'n': 1}, {'n': 2}]
+    assert broadcaster.watchers(1) == 1
+
+
+def test_unsubscribe_ends_the_queue():
+    async def scenario():
+        broadcaster = Broadcaster()
+        subscription = broadcaster.subscribe(1)
+        broadcaster.unsubscribe(subscription)
+        broadcaster.unsubscribe(subscription)
+        return await subscription.get(), broadcaster.watchers(1)
+    assert run(scenario()) == (END, 0)
+
+
+def test_a_watcher_rebuilds_the_game_from_snapshot_and_deltas():
+    # Black's move to (0, 1) captures the white stone in the corner
+    moves = [(2, 2), (0, 0), (1, 0), (3, 3), (0, 1), (4, 4), (1, 1)]
+
+    async def scenario():
+        server = GameServer()
+        listener = await asyncio.start_server(server.handle, '127.0.0.1', 0)
+        port = listener.sockets[0].getsockname()[1]
+        player = await GameClient.connect('127.0.0.1', port)
+        viewer = await GameClient.connect('127.0.0.1', port)
+        try:
+            game = await player.new_game(5)
+            await player.move(game, *moves[0])
+            await viewer.watch(game)
+            for move in moves[1:]:
+                await player.move(game, *move)
+            await player.pass_move(game)
+            events = [await asyncio.wait_for(viewer.events.get(), 5) for _ in range(len(moves) + 1)]
+            return events, server.games[game].logic.hash
+        finally:
+            await player.close()
+            await viewer.close()
+            listener.close()
+            await listener.wait_closed()
+
+    events, server_hash = run(scenario())
+    snapshot, deltas = events[0], events[1:]
+    assert snapshot['type'] == 'snapshot' and snapshot['ply'] == 1
+    assert [event['type'] for event in deltas] == ['delta'] * len(moves)
+    assert [event['ply'] for event in deltas] == list(range(2, len(moves) + 2))
+
+    logic = GameLogic(5)
+    logic.play(*moves[0])
+    for event in deltas:
+        if event['move'] == 'pass':
+            logic.pass_move()
+        else:
+            captured = logic.play(*event['move'])
+            assert sorted(map(list, captured)) == sorted(event['captured'])
+        assert logic.hash == event['hash']
+    assert logic.hash == server_hash
+    assert [event['captured'] for event in deltas][3] == [[0, 0]]
@@ -0,0 +1,133 @@
+import pytest
+
+import clock
+from clock import GameClock, NS
+from game_logic import BLACK, WHITE
+
+
+class FakeTime:
+    def __init__(self):
+        self.ns = 0
+
+    def __call__(self):
+        return self.ns
+
+    def advance(self, seconds):
+        self.ns += int(seconds * NS)
+
+
+@pytest.fixture
+def now():
+    return FakeTime()
+
+
+def started(control, now):
+    game_clock = GameClock(control, now=now)
+    game_clock.start(BLACK)
+    return game_clock
+
+
+def test_absolute_time_runs_down_and_flags(now):
+    game_clock = started(clock.absolute(1), now)
+    now.advance(0.5)
+    assert game_clock.display(BLACK) == '01:00'
+    now.advance(0.5)
+    assert game_clock.display(BLACK) == '00:59'
+    assert game_clock.display(WHITE) == '01:00'
+    assert game_clock.flagged() is None
+    now.advance(59.5)
+    assert game_clock.flagged() == BLACK
+    assert game_clock.seconds_left(BLACK) == 0.0
+
+
+def test_only_the_running_player_is_charged(now):
+    game_clock = started(clock.absolute(1), now)
+    now.advance(10)
+    game_clock.press()
+    now.advance(3)
+    assert game_clock.snapshot() == (50_000, 57_000)
+    game_clock.stop()
+    now.advance(100)
+    assert game_clock.snapshot() == (50_000, 57_000)
+
+
+def test_fischer_adds_the_increment_after_each_move(now):
+    game_clock = started(clock.fischer(1, 5), now)
+    now.advance(10)
+    game_clock.press()
+    assert game_clock.seconds_left(BLACK) == 55
+    now.advance(2)
+    game_clock.press()
+    assert game_clock.seconds_left(WHITE) == 63
+
+
+def test_byoyomi_uses_up_periods_and_resets_within_one(now):
+    game_clock = started(clock.byoyomi(0, 10, 3), now)
+    now.advance(4)
+    game_clock.press()
+    game_clock.press()  # white moves instantly
+    # A move inside the period keeps all three periods
+    assert game_clock.left(BLACK).periods == 3
+    now.advance(25)
+    left = game_clock.left(BLACK)
+    assert (left.periods, left.period) == (1, 5 * NS)
+    assert game_clock.display(BLACK) == '00:00 +1x0:05'
+    assert game_clock.seconds_left(BLACK) == 5
+    now.advance(5)
+    assert game_clock.flagged() == BLACK
+
+
+def test_main_time_before_byoyomi(now):
+    game_clock = started(clock.byoyomi(1, 30, 2), now)
+    assert game_clock.display(BLACK) == '01:00 +2x30s'
+    now.advance(70)
+    assert game_clock.display(BLACK) == '00:00 +2x0:20'
+
+
+def test_undo_and_redo_restore_both_clocks(now):
+    game_clock = started(clock.fischer(1, 5), now)
+    now.advance(10)
+    game_clock.press()
+    now.advance(3)
+    game_clock.press()
+    after = game_clock.snapshot()
+
+    now.advance(7)
+    game_clock.undo()
+    assert game_clock.running == WHITE
+    assert game_clock.snapshot() == (55_000, 60_000)
+    game_clock.undo()
+    assert game_clock.running == BLACK
+    assert game_clock.snapshot() == (60_000, 60_000)
+
+    # Time spent between undo and redo is not charged to anyone
+    now.advance(100)
+    game_clock.redo()
+    game_clock.redo()
+    assert game_clock.running == BLACK
+    assert game_clock.snapshot() == after
+    game_clock.redo()
+    assert game_clock.snapshot() == after
+
+
+def test_a_new_press_discards_redo(now):
+    game_clock = started(clock.absolute(1), now)
+    now.advance(1)
+    game_clock.press()
+    game_clock.undo()
+    game_clock.press()
+    assert game_clock.redo_history == []
+
+
+def test_next_display_change_is_on_a_second_boundary(now):
+    game_clock = started(clock.absolute(1), now)
+    assert game_clock.ns_until_change(BLACK) == NS
+    now.advance(0.25)
+    assert game_clock.ns_until_change(BLACK) == 3 * NS // 4
+
+
+def test_from_settings_picks_the_time_control():
+    assert clock.from_settings({'timer_minutes': 5}) == clock.absolute(5)
+    assert clock.from_settings({'timer_minutes': 5, 'increment_seconds': 3}) == clock.fischer(5, 3)
+    assert (clock.from_settings({'timer_minutes': 5, 'byoyomi_seconds': 20, 'byoyomi_periods': 4})
+            == clock.byoyomi(5, 20, 4))
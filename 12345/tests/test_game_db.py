@@ -0,0 +1,50 @@
+import pytest
+
+from game_db import GameDB, MoveStats, positions
+from game_logic import GameLogic, BLACK, WHITE
+import sgf
+
+GOOD = ['(;SZ[9]PB[a]RE[B+R];B[cc];W[dd];B[cd])',
+        '(;SZ[9]PB[b]RE[W+3.5];B[cc];W[ee])',
+        '(;SZ[9]PB[c]AB[aa:ab];W[ee];B[])']
+BAD = ['(;SZ[9];B[c])', '(;SZ[9];B[AA])', '(;SZ[37];B[aa])']
+
+
+@pytest.fixture
+def db(tmp_path):
+    with GameDB(str(tmp_path / 'games.db')) as db:
+        yield db
+
+
+def test_bad_games_are_skipped_and_the_rest_stored(db, tmp_path):
+    path = tmp_path / 'mixed.sgf'
+    path.write_text('\n'.join([GOOD[0], *BAD, GOOD[1], BAD[0], GOOD[2]]))
+    assert db.add_games(sgf.read_texts(str(path)), batch=2) == 3
+    assert db.skipped == 4
+    assert db.stats()[0] == 3
+    assert [db.game(i).black for i in (1, 2, 3)] == ['a', 'b', 'c']
+
+
+def test_stored_games_read_back_unchanged(db):
+    games = [sgf.parse_game(text) for text in GOOD]
+    assert db.add_games(games) == 3
+    assert [db.game(i) for i in (1, 2, 3)] == games
+    assert db.game(4) is None
+
+
+def test_positions_follow_the_moves(db):
+    db.add_games(GOOD)
+    logic = GameLogic(9)
+    assert db.explore(logic) == [MoveStats((2, 2), 2, 1)]
+    logic.play(2, 2)
+    assert {game.id for game in db.games_reaching(logic.hash, WHITE)} == {1, 2}
+    stats = db.next_moves(logic.hash, WHITE, 9)
+    assert sorted(stat.move for stat in stats) == [(3, 3), (4, 4)]
+
+
+def test_a_damaged_record_indexes_the_positions_before_it():
+    # The third move is on an occupied point, so replay stops there
+    game = sgf.parse_game('(;SZ[9];B[cc];W[dd];B[cc];W[ee])')
+    rows = positions(game)
+    assert [(color, ply) for _, color, ply, _ in rows] == [(BLACK, 0), (WHITE, 1), (BLACK, 2)]
+    assert rows[-1][3] is None
@@ -0,0 +1,165 @@
+import pytest
+
+from bench import record_game
+from game_logic import GameLogic, IllegalMoveError, BLACK, WHITE, EMPTY
+from move_log import NO_MOVES, TIMEOUT
+from selfplay import capture_policy
+
+
+def state(logic):
+    """Everything make/unmake and undo/redo have to put back"""
+    return (bytes(logic.board), logic.hash, logic.to_move, dict(logic.captures), logic.ko,
+            {color: set(points) for color, points in logic.legal.items()},
+            dict(logic.seen), len(logic.log))
+
+
+def played(size, moves):
+    logic = GameLogic(size)
+    for move in moves:
+        if move is None:
+            logic.pass_move()
+        else:
+            logic.play(*move)
+    return logic
+
+
+def test_capture_removes_the_stone_and_counts_it():
+    logic = played(5, [(1, 0), (0, 0)])
+    assert logic.play(0, 1) == [(0, 0)]
+    assert logic.color_at(0, 0) == EMPTY
+    assert logic.captures == {BLACK: 1, WHITE: 0}
+
+
+def test_suicide_is_illegal_and_leaves_the_game_alone():
+    logic = played(5, [(1, 0), None, (0, 1)])
+    before = state(logic)
+    with pytest.raises(IllegalMoveError):
+        logic.play(0, 0)
+    assert state(logic) == before
+
+
+def test_undo_and_redo_round_trip_a_whole_game():
+    logic = GameLogic(9)
+    states = [state(logic)]
+    for move in record_game(9, capture_policy, 3):
+        if move is None:
+            logic.pass_move()
+        else:
+            logic.play(*move)
+        states.append(state(logic))
+    assert logic.captures[BLACK] + logic.captures[WHITE] > 0
+
+    for expected in reversed(states[:-1]):
+        assert logic.undo() is not None
+        assert state(logic) == expected
+    assert logic.undo() is None
+
+    for expected in states[1:]:
+        assert logic.redo() is not None
+        assert state(logic) == expected
+    assert logic.redo() is None
+
+
+def test_make_unmake_restores_the_position():
+    logic = played(9, record_game(9, capture_policy, 4)[:60])
+    before = state(logic)
+    for p in sorted(logic.legal[logic.to_move]):
+        logic.make(p, logic.to_move)
+        logic.unmake()
+        assert state(logic) == before
+
+
+def test_a_new_move_clears_the_redo_stack():
+    logic = played(5, [(1, 1), (2, 2)])
+    logic.undo()
+    logic.play(3, 3)
+    assert logic.redo() is None
+
+
+@pytest.mark.parametrize('end', ['no_moves', 'timeout', 'resign'])
+def test_game_end_records_go_through_the_engine(end):
+    logic = played(5, [(1, 1), (2, 2)])
+    logic.undo()
+    if end == 'no_moves':
+        logic.no_moves()
+    elif end == 'timeout':
+        logic.time_out(BLACK)
+    else:
+        logic.resign()
+    assert logic.redo() is None
+    record = logic.undo()
+    assert len(logic.log) == 1
+    assert logic.redo() == record
+    if end == 'no_moves':
+        assert record.point == NO_MOVES
+    elif end == 'timeout':
+        assert (record.color, record.point) == (BLACK, TIMEOUT)
+
+
+# Black surrounds (1, 1) and white surrounds (2, 1); white then plays
+# into (1, 1) and black captures it from (2, 1)
+KO_SETUP = [(1, 0), (2, 0), (0, 1), (3, 1), (1, 2), (2, 2), (4, 4), (1, 1)]
+
+
+def test_ko_forbids_the_immediate_recapture():
+    logic = played(5, KO_SETUP)
+    assert logic.play(2, 1) == [(1, 1)]
+    assert logic.check_move(1, 1).startswith("Ko")
+    assert not logic.is_legal(1, 1)
+    assert logic.point(1, 1) not in logic.legal[WHITE]
+
+
+def test_ko_is_lifted_by_a_move_elsewhere():
+    logic = played(5, KO_SETUP + [(2, 1), (4, 0), (4, 3)])
+    assert logic.check_move(1, 1) is None
+    assert logic.play(1, 1) == [(2, 1)]
+
+
+def test_superko_forbids_repeating_a_position_after_passes():
+    logic = played(5, KO_SETUP + [(2, 1), None, None])
+    # The passes lift the simple ko, but retaking recreates a position
+    assert logic.ko is None
+    assert logic.check_move(1, 1).startswith("Superko")
+    with pytest.raises(IllegalMoveError):
+        logic.play(1, 1)
+
+
+def test_superko_can_be_turned_off():
+    logic = GameLogic(5, superko=False)
+    for move in KO_SETUP + [(2, 1), None, None]:
+        if move is None:
+            logic.pass_move()
+        else:
+            logic.play(*move)
+    assert logic.play(1, 1) == [(2, 1)]
+
+
+def test_hash_follows_the_position_not_the_move_order():
+    a = played(5, [(0, 0), (4, 4), (1, 1), (3, 3)])
+    b = played(5, [(1, 1), (3, 3), (0, 0), (4, 4)])
+    assert a.hash == b.hash
+    assert a.hash != played(5, [(0, 0), (4, 4), (1, 1)]).hash
+
+
+@pytest.mark.parametrize('size', [2, 7, 13, 19, 25])
+def test_every_supported_size_plays_to_the_far_corner(size):
+    logic = played(size, [(size - 1, size - 2), (size - 1, size - 1)])
+    assert logic.play(size - 2, size - 1) == [(size - 1, size - 1)]
+    assert len(logic.points()) == size * size
+    assert len(logic.to_rows()) == size
+    for x, y in [(0, 0), (size - 1, 0), (0, size - 1), (size - 1, size - 1)]:
+        assert logic.xy(logic.point(x, y)) == (x, y)
+
+
+@pytest.mark.parametrize('size', [1, 26])
+def test_unsupported_sizes_are_rejected(size):
+    with pytest.raises(ValueError):
+        GameLogic(size)
+
+
+def test_moves_off_a_large_board_are_illegal():
+    logic = GameLogic(25)
+    assert logic.check_move(25, 0) is not None
+    assert logic.check_move(-1, 24) is not None
+    with pytest.raises(IllegalMoveError):
+        logic.play(0, 25)
@@ -0,0 +1,66 @@
+from game_logic import GameLogic, BLACK, WHITE
+from mcts import MCTSPlayer, Node
+from move_log import PASS
+
+
+def _engine(player, logic):
+    engine = player._copy(logic)
+    player.points = engine.points()
+    return engine
+
+
+def test_two_passes_make_a_terminal_node():
+    first = Node(PASS, WHITE, None, [])
+    second = Node(PASS, BLACK, first, [])
+    assert second.is_terminal()
+    assert not first.is_terminal()
+    assert not Node(12, BLACK, first, []).is_terminal()
+
+
+def test_playout_from_a_finished_game_only_scores_it():
+    logic = GameLogic(5)
+    logic.play(2, 2)
+    player = MCTSPlayer(komi=0.5, seed=0)
+    engine = _engine(player, logic)
+    board = bytes(engine.board)
+    assert player._playout(engine, WHITE, 2) == BLACK
+    assert bytes(engine.board) == board
+
+
+def test_search_scores_terminal_nodes_without_playing_on(monkeypatch):
+    logic = GameLogic(5)
+    logic.play(2, 2)
+    player = MCTSPlayer(komi=0.5, seed=0)
+    engine = _engine(player, logic)
+    # Black passed at the root and white's pass ends the game
+    root = Node(PASS, BLACK, None, [])
+    root.visits = 1
+    end = Node(PASS, WHITE, root, [])
+    end.visits = 1
+    root.children[PASS] = end
+
+    def no_stones(p, color):
+        raise AssertionError("a stone was played after the game ended")
+    monkeypatch.setattr(engine, 'make', no_stones)
+    player._iterate(engine, root)
+    # Black owns the whole board, so the pass that ended it lost for white
+    assert (end.visits, end.wins) == (2, 0)
+    assert bytes(engine.board) == bytes(logic.board)
+
+
+def test_choose_returns_a_legal_move_and_leaves_the_game_alone():
+    logic = GameLogic(5)
+    logic.play(2, 2)
+    key = logic.position_key()
+    move = MCTSPlayer(seed=1).choose(logic, seconds=0.1)
+    assert logic.position_key() == key
+    assert move is None or logic.is_legal(*move)
+
+
+def test_choose_takes_a_big_capture():
+    # White's four stones on the left edge are left in atari at (1, 2)
+    logic = GameLogic(5)
+    for move in [(1, 0), (0, 0), (1, 1), (0, 1), (2, 2), (0, 2), (1, 3), (0, 3), (0, 4), (4, 4)]:
+        logic.play(*move)
+    assert len(logic.probe(1, 2).captured) == 4
+    assert MCTSPlayer(komi=0.5, seed=2).choose(logic, seconds=0.5) == (1, 2)
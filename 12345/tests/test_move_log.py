@@ -0,0 +1,87 @@
+from bench import record_game
+from game_logic import GameLogic, BLACK, WHITE
+from move_log import MoveLog, MoveRecord, PASS, RESIGN
+from selfplay import capture_policy, random_policy
+
+
+def test_records_round_trip_through_the_arrays():
+    log = MoveLog()
+    log.append(BLACK, 30, clock=(1000, 2000))
+    log.append(WHITE, 31, captured=(30, 42), clock=(900, 1900))
+    log.append(BLACK, PASS, clock=(800, 1900))
+    log.append(WHITE, RESIGN)
+
+    assert len(log) == 4
+    assert log[0] == MoveRecord(BLACK, 30, (), (1000, 2000))
+    assert log[1] == MoveRecord(WHITE, 31, (30, 42), (900, 1900))
+    assert log[-2].is_pass and not log[-2].is_stone
+    assert log[-1].point == RESIGN
+    assert [record.point for record in log] == [30, 31, PASS, RESIGN]
+
+
+def test_pop_removes_the_last_record_and_its_captures():
+    log = MoveLog()
+    log.append(BLACK, 30)
+    log.append(WHITE, 31, captured=(30,))
+    assert log.pop() == MoveRecord(WHITE, 31, (30,), (0, 0))
+    log.append(WHITE, 32)
+    assert log[1] == MoveRecord(WHITE, 32, (), (0, 0))
+    assert len(log.captured) == 0
+
+
+def test_engine_logs_moves_with_their_captures():
+    logic = GameLogic(5)
+    logic.play(1, 0)
+    logic.play(0, 0)
+    logic.play(0, 1)
+    record = logic.log[-1]
+    assert record.color == BLACK
+    assert logic.xy(record.point) == (0, 1)
+    assert [logic.xy(p) for p in record.captured] == [(0, 0)]
+
+
+def test_nbytes_stays_small_for_a_long_game():
+    logic = GameLogic(19)
+    moves = [(x, y) for y in range(19) for x in range(19) if (x + y) % 3 == 0][:120]
+    for x, y in moves:
+        logic.play(x, y)
+    # a few bytes per move plus one board keyframe every 16 moves
+    assert logic.log.nbytes() < 120 * 12 + 9 * len(logic.board)
+
+
+def _played_boards(size, moves):
+    """Logic after playing moves, and the board after each of them"""
+    logic = GameLogic(size)
+    boards = [bytes(logic.board)]
+    for move in moves:
+        if move is None:
+            logic.pass_move()
+        else:
+            logic.play(*move)
+        boards.append(bytes(logic.board))
+    return logic, boards
+
+
+def test_board_at_matches_every_position_of_a_game():
+    moves = record_game(9, capture_policy, 1)
+    logic, boards = _played_boards(9, moves)
+    assert sum(len(record.captured) for record in logic.log) > 0
+    assert len(logic.log.keyframes) > 1
+    for count, board in enumerate(boards):
+        assert logic.log.board_at(count) == board
+
+
+def test_board_at_clamps_out_of_range_counts():
+    logic, boards = _played_boards(5, [(1, 1), (2, 2)])
+    assert logic.log.board_at(-3) == boards[0]
+    assert logic.log.board_at(99) == boards[-1]
+
+
+def test_board_at_after_undo_past_a_keyframe():
+    moves = record_game(9, random_policy, 2)[:40]
+    logic, boards = _played_boards(9, moves)
+    for _ in range(10):
+        logic.undo()
+    logic.pass_move()
+    assert logic.log.board_at(30) == boards[30]
+    assert logic.log.board_at(31) == boards[30]
@@ -0,0 +1,42 @@
+import pytest
+
+import perf
+
+
+@pytest.fixture(autouse=True)
+def counters():
+    perf.reset()
+    yield
+    perf.enable(False)
+    perf.reset()
+
+
+def test_disabled_timers_share_one_object_and_record_nothing():
+    assert perf.timed('a') is perf.timed('b')
+    with perf.timed('a'):
+        pass
+    perf.gauge('g', 1)
+    assert perf.timings == {} and perf.gauges == {}
+
+
+def test_enabled_timers_record_every_block():
+    perf.enable()
+    for _ in range(3):
+        with perf.timed('a'):
+            pass
+    with pytest.raises(KeyError):
+        with perf.timed('a'):
+            raise KeyError('still timed')
+    timing = perf.timings['a']
+    assert timing.count == 4
+    assert timing.total >= timing.max >= timing.last >= 0
+
+
+def test_dump_appends_a_snapshot(tmp_path):
+    perf.enable()
+    perf.gauge('boards', 7)
+    path = tmp_path / 'perf.jsonl'
+    perf.dump(str(path))
+    perf.dump(str(path))
+    lines = path.read_text().splitlines()
+    assert len(lines) == 2 and '"boards": 7' in lines[0]
@@ -0,0 +1,67 @@
+import pytest
+
+import scoring
+from scoring import EMPTY, BLACK, WHITE, BORDER
+
+# Black walls off the left two columns, white the right two; the middle
+# column touches both and belongs to nobody
+SPLIT = ['.B.W.',
+         '.B.W.',
+         '.B.W.',
+         '.B.W.',
+         '.B.W.']
+
+
+def board(rows):
+    """Flat padded board from rows of '.', 'B' and 'W'"""
+    width = len(rows) + 2
+    flat = bytearray([BORDER]) * (width * width)
+    for y, row in enumerate(rows):
+        for x, char in enumerate(row):
+            flat[(y + 1) * width + x + 1] = {'.': EMPTY, 'B': BLACK, 'W': WHITE}[char]
+    return flat, width
+
+
+def test_area_scoring_counts_stones_and_territory():
+    flat, width = board(SPLIT)
+    result = scoring.score(flat, width, komi=6.5, rules='area')
+    assert (result.black, result.white) == (10, 16.5)
+
+
+def test_territory_scoring_counts_territory_and_prisoners():
+    flat, width = board(SPLIT)
+    result = scoring.score(flat, width, {BLACK: 3, WHITE: 1}, komi=6.5)
+    assert (result.black, result.white) == (8, 12.5)
+    assert scoring.score(flat, width).black == 5
+
+
+def test_a_region_touching_both_colors_is_neutral():
+    flat, width = board(SPLIT)
+    owner = scoring.score(flat, width).owner
+    assert [owner[(y + 1) * width + 3] for y in range(5)] == [EMPTY] * 5
+    assert owner[width + 1] == BLACK and owner[width + 5] == WHITE
+    # Stones themselves are not marked as owned territory
+    assert owner[width + 2] == EMPTY
+    _, counts = scoring.territory(flat, width)
+    assert counts == {BLACK: 5, WHITE: 5}
+
+
+def test_an_empty_board_has_no_territory():
+    flat, width = board(['...'] * 3)
+    assert scoring.territory(flat, width)[1] == {BLACK: 0, WHITE: 0}
+    result = scoring.score(flat, width, komi=0.5, rules='area')
+    assert (result.black, result.white) == (0, 0.5)
+
+
+def test_unknown_rules_are_rejected():
+    flat, width = board(SPLIT)
+    with pytest.raises(ValueError, match='Unknown scoring rules'):
+        scoring.score(flat, width, rules='japanese')
+
+
+def test_score_many_scores_each_board_with_its_own_captures():
+    split, width = board(SPLIT)
+    black_only, _ = board(['.B...'] * 5)
+    results = scoring.score_many([split, black_only], width, [{BLACK: 2}, None], komi=0.5)
+    assert [(r.black, r.white) for r in results] == [(7, 5.5), (25 - 5, 0.5)]
+    assert scoring.score_many([split], width, rules='area')[0].black == 10
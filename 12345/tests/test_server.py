@@ -0,0 +1,156 @@
+import asyncio
+import json
+import threading
+
+import pytest
+
+from client import GameClient, RemoteGame, ServerError
+from server import GameServer, ProtocolError
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+async def _new(server, **fields):
+    return (await server.dispatch({'op': 'new', **fields}))['game']
+
+
+def test_moves_update_the_server_board():
+    async def scenario():
+        server = GameServer()
+        game = await _new(server, size=5)
+        reply = await server.dispatch({'op': 'move', 'game': game, 'x': 2, 'y': 2})
+        assert reply['to_move'] == 'white'
+        await server.dispatch({'op': 'move', 'game': game, 'x': 0, 'y': 1})
+        return await server.dispatch({'op': 'state', 'game': game})
+    state = run(scenario())
+    rows = [state['board'][i:i + 5] for i in range(0, 25, 5)]
+    assert rows == ['.....', 'W....', '..B..', '.....', '.....']
+    assert (state['ply'], state['to_move'], state['result']) == (2, 'black', None)
+
+
+def test_captures_are_reported():
+    async def scenario():
+        server = GameServer()
+        game = await _new(server, size=5)
+        for x, y in [(1, 0), (0, 0)]:
+            await server.dispatch({'op': 'move', 'game': game, 'x': x, 'y': y})
+        return await server.dispatch({'op': 'move', 'game': game, 'x': 0, 'y': 1})
+    assert [tuple(point) for point in run(scenario())['captured']] == [(0, 0)]
+
+
+def test_errors_come_back_as_replies():
+    async def scenario():
+        server = GameServer()
+        game = await _new(server, size=5)
+        await server.respond(json.dumps({'op': 'move', 'game': game, 'x': 1, 'y': 1}))
+        return [await server.respond(line) for line in [
+            json.dumps({'id': 1, 'op': 'move', 'game': game, 'x': 1, 'y': 1}),
+            json.dumps({'id': 2, 'op': 'move', 'game': 99, 'x': 1, 'y': 1}),
+            json.dumps({'id': 3, 'op': 'dance', 'game': game}),
+            json.dumps({'id': 4, 'op': 'move', 'game': game}),
+            json.dumps({'id': 5, 'op': 'new', 'control': [600]}),
+            json.dumps({'id': 6, 'op': 'new', 'control': {'main': 'soon'}}),
+            'not json',
+            '[1, 2]',
+        ]]
+    replies = run(scenario())
+    assert all(not reply['ok'] for reply in replies)
+    assert [reply.get('id') for reply in replies] == [1, 2, 3, 4, 5, 6, None, None]
+    assert 'occupied' in replies[0]['error']
+    assert 'no game' in replies[1]['error']
+    assert 'unknown op' in replies[2]['error']
+    assert 'control must be' in replies[4]['error']
+
+
+def test_two_passes_score_the_game():
+    async def scenario():
+        server = GameServer()
+        game = await _new(server, size=5, komi=7.5)
+        await server.dispatch({'op': 'move', 'game': game, 'x': 2, 'y': 2})
+        await server.dispatch({'op': 'pass', 'game': game})
+        reply = await server.dispatch({'op': 'pass', 'game': game})
+        with pytest.raises(ProtocolError, match='over'):
+            await server.dispatch({'op': 'move', 'game': game, 'x': 0, 'y': 0})
+        return reply
+    assert run(scenario())['result'] == 'B+17.5'
+
+
+def test_resign_names_the_winner():
+    async def scenario():
+        server = GameServer()
+        game = await _new(server, size=9)
+        await server.dispatch({'op': 'move', 'game': game, 'x': 2, 'y': 2})
+        return await server.dispatch({'op': 'resign', 'game': game})
+    assert run(scenario())['result'] == 'B+R'
+
+
+def test_the_server_clock_flags_a_slow_player():
+    async def scenario():
+        server = GameServer()
+        game = await _new(server, size=9, control={'main': 10})
+        hosted = server.games[game]
+        hosted.clock.now = lambda: hosted.clock.started + 11 * 10**9
+        reply = await server.respond(json.dumps({'op': 'move', 'game': game, 'x': 2, 'y': 2}))
+        return reply, hosted.result
+    reply, result = run(scenario())
+    assert not reply['ok'] and 'ran out of time' in reply['error']
+    assert result == 'W+T'
+
+
+def test_max_games_is_enforced():
+    async def scenario():
+        server = GameServer(max_games=1)
+        await _new(server)
+        with pytest.raises(ProtocolError, match='full'):
+            await _new(server)
+    run(scenario())
+
+
+def test_pipelined_requests_over_a_socket():
+    async def scenario():
+        server = GameServer()
+        listener = await asyncio.start_server(server.handle, '127.0.0.1', 0)
+        port = listener.sockets[0].getsockname()[1]
+        client = await GameClient.connect('127.0.0.1', port)
+        try:
+            games = await asyncio.gather(*(client.new_game(5) for _ in range(10)))
+            replies = await asyncio.gather(*(client.move(game, 1, 1) for game in games))
+            with pytest.raises(ServerError):
+                await client.move(games[0], 1, 1)
+            return games, replies, server.moves
+        finally:
+            await client.close()
+            listener.close()
+            await listener.wait_closed()
+    games, replies, moves = run(scenario())
+    assert len(set(games)) == 10
+    assert all(reply['to_move'] == 'white' for reply in replies)
+    assert moves == 10
+
+
+def test_remote_game_restart_replaces_the_hosted_game():
+    server = GameServer()
+    loop = asyncio.new_event_loop()
+    listener = loop.run_until_complete(asyncio.start_server(server.handle, '127.0.0.1', 0))
+    port = listener.sockets[0].getsockname()[1]
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        remote = RemoteGame('127.0.0.1', port, size=9)
+        first = remote.game
+        remote.move(2, 2)
+        with pytest.raises(ServerError, match='occupied'):
+            remote.move(2, 2)
+        remote.restart(size=5)
+        state = remote.state()
+        assert remote.game != first and first not in server.games
+        assert (state['ply'], len(state['board'])) == (0, 25)
+        remote.close()
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        listener.close()
+        loop.run_until_complete(listener.wait_closed())
+        loop.close()
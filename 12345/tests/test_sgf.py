@@ -0,0 +1,80 @@
+import io
+
+import pytest
+
+from bench import record_game
+from game_logic import GameLogic, BLACK, WHITE
+from selfplay import capture_policy
+import sgf
+
+
+def _game(seed=5, size=9):
+    logic = GameLogic(size)
+    for move in record_game(size, capture_policy, seed):
+        if move is None:
+            logic.pass_move()
+        else:
+            logic.play(*move)
+    return logic
+
+
+def test_game_round_trips_through_sgf_text():
+    logic = _game()
+    game = sgf.from_logic(logic, 'Alice', 'Bob', 6.5, 'W+12.5')
+    parsed = sgf.parse_game(sgf.game_text(game))
+    assert parsed == game
+    replayed = sgf.to_logic(parsed)
+    assert replayed.board == logic.board
+    assert list(replayed.log.points) == list(logic.log.points)
+
+
+def test_names_with_brackets_and_backslashes_are_escaped():
+    game = sgf.SgfGame(9, 0.0, None, 'a]b\\c', '[x]', [(BLACK, 2, 3)], [])
+    text = sgf.game_text(game)
+    assert 'PB[a\\]b\\\\c]' in text
+    assert sgf.parse_game(text) == game
+
+
+def test_passes_and_setup_stones():
+    game = sgf.SgfGame(19, 7.5, None, '', '', [(BLACK, None, None), (WHITE, 3, 3)],
+                       [(BLACK, 0, 0), (BLACK, 18, 18), (WHITE, 9, 9)])
+    parsed = sgf.parse_game(sgf.game_text(game))
+    assert parsed.moves == game.moves
+    assert sorted(parsed.setup) == sorted(game.setup)
+    assert sgf.parse_game('(;SZ[19];B[tt];W[])').moves == [(BLACK, None, None), (WHITE, None, None)]
+
+
+def test_setup_rectangles_are_expanded():
+    game = sgf.parse_game('(;SZ[9]AB[aa:bb]AW[cc])')
+    assert game.setup == [(BLACK, 0, 0), (BLACK, 1, 0), (BLACK, 0, 1), (BLACK, 1, 1), (WHITE, 2, 2)]
+
+
+@pytest.mark.parametrize('text', ['(;SZ[9];B[c])', '(;SZ[9];B[AA])', '(;SZ[9];W[abc])',
+                                  '(;SZ[37];B[aa])', '(;SZ[1])'])
+def test_malformed_games_raise_value_error(text):
+    with pytest.raises(ValueError):
+        sgf.parse_game(text)
+
+
+def test_only_the_main_line_of_variations_is_kept():
+    text = '(;SZ[9];B[aa](;W[bb];B[cc])(;W[dd]))'
+    assert sgf.parse_game(text).moves == [(BLACK, 0, 0), (WHITE, 1, 1), (BLACK, 2, 2)]
+
+
+def test_collections_stream_in_small_chunks():
+    games = [sgf.from_logic(_game(seed, 7), f'p{seed}', 'q]', 7.5) for seed in range(5)]
+    out = io.StringIO()
+    out.write('junk before the first game\n')
+    sgf.write_games(out, games)
+    stream = io.StringIO(out.getvalue())
+    texts = list(sgf.game_texts(stream, chunk_size=5))
+    assert [sgf.parse_game(text) for text in texts] == games
+
+
+def test_read_games_from_files_and_directories(tmp_path):
+    games = [sgf.from_logic(_game(seed, 7), komi=7.5) for seed in range(3)]
+    sgf.write_games(str(tmp_path / 'a.sgf'), games[:2])
+    (tmp_path / 'sub').mkdir()
+    sgf.write_games(str(tmp_path / 'sub' / 'b.sgf'), games[2:])
+    assert list(sgf.read_games(str(tmp_path / 'a.sgf'))) == games[:2]
+    assert list(sgf.read_games(str(tmp_path))) == games
@@ -0,0 +1,97 @@
+"""In-process event tracing into a fixed-size ring buffer.
+
+Events are (time, level, name, fields) tuples kept in a deque with a
+maximum length, so the newest CAPACITY events are always available and
+old ones fall off without any cleanup. Events below the current level
+are dropped after one comparison, so tracing calls can stay in hot
+paths. dump() writes the buffer to a JSON lines file for post-mortems.
+
+The starting level can be set with the GO_TRACE environment variable
+(debug, info, warning, error or off).
+"""
+import json
+import os
+import time
+import traceback
+from collections import deque
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+OFF = 100
+
+LEVELS = {'debug': DEBUG, 'info': INFO, 'warning': WARNING, 'error': ERROR, 'off': OFF}
+LEVEL_NAMES = {value: name for name, value in LEVELS.items()}
+
+CAPACITY = 4096
+
+level = LEVELS.get(os.environ.get('GO_TRACE', '').lower(), WARNING)
+events = deque(maxlen=CAPACITY)
+
+
+def set_level(new_level):
+    """Record events at new_level and above; accepts a number or a name"""
+    global level
+    level = LEVELS[new_level.lower()] if isinstance(new_level, str) else new_level
+
+
+def enabled(at_level):
+    return at_level >= level
+
+
+def resize(capacity):
+    """Change how many events are kept, keeping the newest ones"""
+    global events
+    events = deque(events, maxlen=capacity)
+
+
+def clear():
+    events.clear()
+
+
+def event(at_level, name, **fields):
+    if at_level >= level:
+        events.append((time.time_ns(), at_level, name, fields))
+
+
+def debug(name, **fields):
+    if DEBUG >= level:
+        events.append((time.time_ns(), DEBUG, name, fields))
+
+
+def info(name, **fields):
+    if INFO >= level:
+        events.append((time.time_ns(), INFO, name, fields))
+
+
+def warning(name, **fields):
+    if WARNING >= level:
+        events.append((time.time_ns(), WARNING, name, fields))
+
+
+def error(name, **fields):
+    if ERROR >= level:
+        events.append((time.time_ns(), ERROR, name, fields))
+
+
+def exception(name, **fields):
+    """Record the exception being handled, with its traceback, as an error"""
+    if ERROR >= level:
+        fields['error'] = traceback.format_exc()
+        events.append((time.time_ns(), ERROR, name, fields))
+
+
+def records():
+    """The buffered events, oldest first, as dicts"""
+    return [{'time': t / 1e9, 'level': LEVEL_NAMES.get(lvl, lvl), 'event': name, **fields}
+            for t, lvl, name, fields in list(events)]
+
+
+def dump(path):
+    """Append the buffered events to a JSON lines file; returns how many"""
+    lines = records()
+    with open(path, 'a') as f:
+        for record in lines:
+            f.write(json.dumps(record, default=repr) + '\n')
+    return len(lines)
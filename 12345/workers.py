@@ -0,0 +1,76 @@
+import traceback
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+import tracing
+
+
+class EngineWorker(QObject):
+    """Runs engine jobs (AI search, scoring) in a worker process.
+
+    Jobs are plain module level functions and picklable arguments, so the
+    Qt event loop keeps painting and ticking the clock while they run. The
+    pool's result thread hands each result back through a queued signal and
+    the callback runs on the UI thread.
+
+    Every job belongs to the generation current when it was submitted.
+    cancel() starts a new generation, so results of older jobs are dropped;
+    jobs still running are stopped by terminating the pool, which is
+    started again on the next submit.
+    """
+
+    # Emitted from the pool's result thread, delivered on the UI thread
+    _done = pyqtSignal(int, int, object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, parent=None, processes=1):
+        super().__init__(parent)
+        self.processes = processes
+        self.pool = None
+        self.generation = 0
+        self.next_job = 0
+        self.callbacks = {}  # job id -> callback, for jobs not yet delivered
+        self._done.connect(self._deliver)
+
+    def submit(self, function, args, callback):
+        """Run function(*args) in a worker and call callback(result) when done"""
+        if self.pool is None:
+            # Imported here so startup does not pay for multiprocessing.
+            # Forking a process that runs Qt is unsafe, so start fresh ones
+            import multiprocessing
+            self.pool = multiprocessing.get_context('spawn').Pool(self.processes)
+        job = self.next_job
+        self.next_job += 1
+        generation = self.generation
+        self.callbacks[job] = callback
+        self.pool.apply_async(function, args,
+                              callback=lambda result: self._done.emit(generation, job, result),
+                              error_callback=lambda error: self._done.emit(generation, job, error))
+        return job
+
+    def busy(self):
+        return bool(self.callbacks)
+
+    def cancel(self):
+        """Forget every pending job and stop any that are still running"""
+        self.generation += 1
+        if self.callbacks and self.pool is not None:
+            self.pool.terminate()
+            self.pool = None
+        self.callbacks.clear()
+
+    def shutdown(self):
+        self.cancel()
+        if self.pool is not None:
+            self.pool.close()
+            self.pool = None
+
+    def _deliver(self, generation, job, result):
+        if generation != self.generation:
+            return
+        callback = self.callbacks.pop(job, None)
+        if isinstance(result, BaseException):
+            tracing.error('engine_worker', error=''.join(traceback.format_exception(result)))
+            self.failed.emit(str(result))
+        elif callback is not None:
+            callback(result)